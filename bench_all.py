@@ -0,0 +1,119 @@
+"""
+Single benchmark entry point: stream the dataset ONCE, build the BST and
+the Treap on separate cores, and emit one side-by-side comparison chart.
+
+Running bstMain and treapMain separately costs two full dataset passes
+(decompress + parse) plus two sequential builds. Here the decoded records
+are read once and handed to a two-worker ProcessPoolExecutor; the builds
+are independent, so they overlap fully. Each worker returns plain metric
+numbers (trees stay in the worker -- only the records list is pickled).
+
+Usage: python bench_all.py [limit] [--no-plot]
+"""
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+from src.Utility.utils import (stream_batches, get_structural_metrics,
+                               get_structural_metrics_soa)
+
+DATASET_PATH = "/kaggle/input/the-pushshift-reddit-dataset-submissions/RC_2019-04.zst"
+
+
+def build_and_measure(kind, records):
+    """
+    Top-level (picklable) worker. records are (timestamp, post_id, score)
+    tuples pre-sorted by timestamp; builds the requested tree via its O(N)
+    bulk path and returns a dict of metrics.
+    """
+    start = time.perf_counter()
+    if kind == 'bst':
+        from src.BinarySearchTree import ArrayBST
+        tree = ArrayBST(capacity=max(len(records), 1))
+        tree.build_from_sorted([r[1] for r in records],
+                               [r[0] for r in records],
+                               [r[2] for r in records])
+        build_time = time.perf_counter() - start
+        height, total_bf, count = get_structural_metrics_soa(
+            tree.left, tree.right, tree.root, tree.n_used)
+    else:
+        from src.Treap.treap import Treap
+        treap = Treap()
+        treap.build_from_sorted([(r[1], r[0], r[2]) for r in records])
+        build_time = time.perf_counter() - start
+        height, total_bf, count = get_structural_metrics(treap.root)
+
+    return {
+        'kind': kind,
+        'build_time': build_time,
+        'avg_insert': build_time / count if count else 0.0,
+        'height': height,
+        'avg_bf': total_bf / count if count else 0.0,
+        'count': count,
+    }
+
+
+def plot_side_by_side(bst_m, trp_m, output_file):
+    # Agg canvas directly (no pyplot global state), lazy import so --no-plot
+    # runs never pay the matplotlib startup cost.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(10, 6))
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+
+    metrics = ['Avg Insert (x1k ms)', 'Height', 'Avg Bal. Factor']
+    bst_vals = [bst_m['avg_insert'] * 1000, bst_m['height'], bst_m['avg_bf']]
+    trp_vals = [trp_m['avg_insert'] * 1000, trp_m['height'], trp_m['avg_bf']]
+
+    x = range(len(metrics))
+    bst_bars = ax.bar([i - 0.2 for i in x], bst_vals, width=0.4,
+                      label='BST', color='darkred')
+    trp_bars = ax.bar([i + 0.2 for i in x], trp_vals, width=0.4,
+                      label='Treap', color='darkblue')
+    ax.set_xticks(list(x))
+    ax.set_xticklabels(metrics)
+    ax.set_title(f"BST vs Treap (N={bst_m['count']})")
+    ax.bar_label(bst_bars, fmt='%.2f')
+    ax.bar_label(trp_bars, fmt='%.2f')
+    ax.legend()
+    canvas.print_png(output_file)
+    print(f"Graph saved: {output_file}")
+
+
+def main():
+    limit_arg = 50000
+    for arg in sys.argv[1:]:
+        try:
+            val = int(arg)
+            if val > 0: limit_arg = val
+        except ValueError: pass
+
+    print("=== COMBINED BST vs TREAP BENCHMARK ===")
+    print(f"Processing {limit_arg} nodes (single dataset pass)...")
+
+    records = []
+    for pids, tss, scores in stream_batches(DATASET_PATH, limit=limit_arg):
+        records.extend(zip(tss, pids, scores))
+        print(f"Read {len(records)}...")
+    records.sort(key=itemgetter(0))
+
+    with ProcessPoolExecutor(max_workers=2) as ex:
+        f_bst = ex.submit(build_and_measure, 'bst', records)
+        f_trp = ex.submit(build_and_measure, 'treap', records)
+        bst_m, trp_m = f_bst.result(), f_trp.result()
+
+    for m in (bst_m, trp_m):
+        print(f"\n--- {m['kind'].upper()} ---")
+        print(f"Build Time: {m['build_time']:.4f} sec")
+        print(f"Tree Height: {m['height']}")
+        print(f"Avg Balance Factor: {m['avg_bf']:.2f}")
+
+    if '--no-plot' not in sys.argv:
+        plot_side_by_side(bst_m, trp_m, 'comparison_result.png')
+
+
+if __name__ == "__main__":
+    main()
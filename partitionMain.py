@@ -1,18 +1,41 @@
 import time
+import gc
 import os
+import queue
 import sys
+import threading
+from operator import itemgetter
 
-# Increase recursion limit because merging massive trees can be deep.
-# Default is 1000; we need more for processing millions of nodes safely.
-sys.setrecursionlimit(200000)
-
+# No raised recursion limit needed anymore: every Treap operation (insert,
+# like, delete, split, union) is iterative with explicit stacks.
 from src.Treap.treap import Treap
-from src.Utility.utils import stream_reddit_dataset, get_structural_metrics
+from src.Utility.utils import (stream_batches, stream_raw_chunks, _loads,
+                               get_structural_metrics)
 
 # CONFIGURATION
 DATASET_PATH = "/kaggle/input/the-pushshift-reddit-dataset-submissions/RC_2019-04.zst"
 PARTITION_SIZE = 100000  # Process 100k nodes at a time (RAM efficient)
 
+
+def _parse_and_sort(raw):
+    """
+    Worker-pool task: decode one raw newline-delimited byte block into
+    (post_id, timestamp, score) tuples and sort by timestamp. Top-level so
+    multiprocessing can pickle it; the heavy JSON parsing runs on the
+    worker cores while the parent only builds and unions.
+    """
+    records = []
+    for line in raw.splitlines():
+        if not line:
+            continue
+        try:
+            data = _loads(line)
+            records.append((int(data['id'], 36), int(data['created_utc']),
+                            int(data['score'])))
+        except (KeyError, ValueError): continue
+    records.sort(key=itemgetter(1))
+    return records
+
 def main():
     print(f"=== n-TREAPS PARTITIONING STRATEGY ===")
     print(f"Strategy: Divide (Build Partitions) & Conquer (Union Merge)")
@@ -31,57 +54,128 @@ def main():
             print("Invalid argument. Using default (Entire Dataset).")
     else:
         print("No limit argument provided. Processing ENTIRE DATASET.")
-    
+
+    # --workers N parses chunks on a multiprocessing pool (decode + sort
+    # are embarrassingly parallel); the parent keeps the O(N) build and
+    # the union chain, which must stay on one core anyway.
+    workers = 1
+    if '--workers' in sys.argv:
+        try:
+            workers = int(sys.argv[sys.argv.index('--workers') + 1])
+        except (IndexError, ValueError):
+            print("Invalid --workers value. Using 1.")
+        if workers > 1:
+            print(f"Parsing chunks on {workers} worker processes.")
+
     # The Master Treap starts empty
     master_treap = Treap()
     start_total = time.perf_counter()
     
-    # Stream Generator
-    dataset_stream = stream_reddit_dataset(DATASET_PATH, limit=limit_arg)
-    
+    # Chunk source (one chunk == one sorted partition of records).
+    pool = None
+    if workers > 1:
+        # Worker pool: the parent streams raw byte blocks (cheap to
+        # pickle) and the workers JSON-decode + sort them in parallel.
+        from multiprocessing import Pool
+        pool = Pool(workers)
+        sorted_chunks = pool.imap(
+            _parse_and_sort,
+            stream_raw_chunks(DATASET_PATH, batch_size=PARTITION_SIZE,
+                              limit=limit_arg),
+            chunksize=1)
+    else:
+        # Single-process: prefetch decoded batches on a background thread.
+        # zstd decompression and file I/O release the GIL, so decoding the
+        # next chunk overlaps with the GIL-holding build/union work on the
+        # main thread. The bounded queue (4 chunks) keeps at most ~4
+        # partitions of decoded records in flight.
+        chunk_queue = queue.Queue(maxsize=4)
+        _SENTINEL = None
+
+        def _producer():
+            try:
+                for batch in stream_batches(DATASET_PATH,
+                                            batch_size=PARTITION_SIZE,
+                                            limit=limit_arg):
+                    chunk_queue.put(batch)
+            finally:
+                chunk_queue.put(_SENTINEL)
+
+        threading.Thread(target=_producer, daemon=True).start()
+
+        def _sorted_chunks():
+            while True:
+                batch = chunk_queue.get()
+                if batch is _SENTINEL:
+                    return
+                pids, tss, scores = batch
+                chunk = list(zip(pids, tss, scores))
+                chunk.sort(key=itemgetter(1))  # sort by timestamp (the BST key)
+                yield chunk
+
+        sorted_chunks = _sorted_chunks()
+
     total_processed = 0
     partition_count = 0
-    
+
+    # Tournament merge: finished partition treaps wait on a stack and are
+    # collapsed pairwise whenever the top two are within 2x in size
+    # (LSM-tree / binomial-heap policy). A linear left-fold into the master
+    # re-walks the ever-growing master once per partition -- O(k^2) node
+    # visits over k partitions; the tournament keeps every union between
+    # similarly sized trees, for O(k log k)-ish total merge work (and those
+    # balanced unions hit the flatten+rebuild fast path in Treap.union).
+    # The cycle collector is paused during the build/union phase -- walking
+    # millions of linked nodes per incremental GC pass causes pause spikes
+    # and creeping RSS -- and run once explicitly per partition instead.
+    pending = []  # partition treaps, roughly ascending in size
+    gc.disable()
+
     try:
-        while True:
+        for chunk_nodes in sorted_chunks:
             partition_count += 1
-            chunk_nodes = []
-            
-            # 1. READ CHUNK (Linear Scan)
-            try:
-                for _ in range(PARTITION_SIZE):
-                    chunk_nodes.append(next(dataset_stream))
-            except StopIteration:
-                pass # Stream ended
-            
-            if not chunk_nodes:
-                print(">>> End of dataset stream reached.")
-                break
-                
-            # 2. BUILD INDEPENDENT TREAP (Divide)
+
+            # 1. BUILD INDEPENDENT TREAP (Divide)
+            # The chunk arrives decoded and timestamp-sorted; one O(N)
+            # Cartesian-tree pass builds it, instead of N O(log N) inserts.
             t0 = time.perf_counter()
             temp_treap = Treap()
-            for pid, ts, score in chunk_nodes:
-                temp_treap.addPost(pid, ts, score)
+            temp_treap.build_from_sorted(chunk_nodes)
             t_build = time.perf_counter() - t0
-            
-            # 3. MERGE INTO MASTER (Conquer via Union)
+
+            # 2. TOURNAMENT MERGE (Conquer via pairwise Union)
             t0 = time.perf_counter()
-            master_treap.union(temp_treap)
+            pending.append(temp_treap)
+            while (len(pending) >= 2
+                   and pending[-1].size * 2 >= pending[-2].size):
+                b = pending.pop()
+                a = pending.pop()
+                a.union(b)
+                pending.append(a)
             t_merge = time.perf_counter() - t0
-            
-            # 4. MEMORY CLEANUP
-            del temp_treap
-            del chunk_nodes
-            
-            total_processed += PARTITION_SIZE
+
+            # 3. MEMORY CLEANUP (one controlled pass per partition)
+            gc.collect()
+
+            total_processed += len(chunk_nodes)
             print(f"Partition {partition_count}: Built {t_build:.2f}s | Merged {t_merge:.2f}s | Total: {total_processed}")
-            
+
             if total_processed % 1000000 == 0:
                 print(f"*** MILESTONE: {total_processed/1000000:.1f}M Nodes ***")
 
+        print(">>> End of dataset stream reached.")
+
     except KeyboardInterrupt:
         print("\n!!! User stopped execution. Finalizing... !!!")
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    # Fold whatever is still pending (largest last) into the master.
+    for t in reversed(pending):
+        master_treap.union(t)
+    pending.clear()
 
     # --- FINAL METRICS ---
     final_time = time.perf_counter() - start_total
@@ -0,0 +1,59 @@
+"""
+One-time materialization of the Reddit .zst dump into a memory-mappable
+Arrow IPC file.
+
+zstd decompression is CPU-bound at a few hundred MB/s per core, so every
+benchmark run that re-reads the raw dump (bstMain, treapMain,
+partitionMain) pays the full decompress + JSON parse cost again. This
+script pays it once: stream the .zst, project (id, created_utc, score),
+sort by created_utc (the tree key), and write the columns to
+data/reddit_submissions.arrow. Subsequent runs memory-map that file
+zero-copy via utils.stream_batches.
+
+Usage:
+    python scripts/materialize.py [source.zst] [dest.arrow] [limit]
+
+Requires pyarrow (only for this script and for reading the cache).
+"""
+import os
+import sys
+
+# Allow running from the repo root or from scripts/.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow as pa
+
+from src.Utility.utils import CACHE_PATH, stream_reddit_batches
+
+DEFAULT_SRC = "/kaggle/input/the-pushshift-reddit-dataset-submissions/RC_2019-04.zst"
+
+
+def materialize(src, dest, limit=None):
+    pids, tss, scores = [], [], []
+    for batch_pids, batch_tss, batch_scores in stream_reddit_batches(src, limit=limit):
+        pids.extend(batch_pids)
+        tss.extend(batch_tss)
+        scores.extend(batch_scores)
+        print(f"Decoded {len(pids)}...")
+
+    # ids arrive already base36-decoded to int64 by stream_reddit_batches,
+    # so the cache stores three pure int64 columns.
+    table = pa.table({'id': pa.array(pids, type=pa.int64()),
+                      'created_utc': pa.array(tss, type=pa.int64()),
+                      'score': pa.array(scores, type=pa.int64())})
+    table = table.sort_by('created_utc')
+
+    dest_dir = os.path.dirname(dest)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+    with pa.OSFile(dest, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    print(f"Wrote {table.num_rows} rows -> {dest}")
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SRC
+    dest = sys.argv[2] if len(sys.argv) > 2 else CACHE_PATH
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    materialize(src, dest, limit)
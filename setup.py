@@ -0,0 +1,30 @@
+"""
+Builds the optional compiled treap extension:
+
+    pip install cython
+    python setup.py build_ext --inplace
+
+Everything keeps working without it -- src/Treap/treap.py falls back to
+the pure-Python classes when the extension is missing.
+"""
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+setup(
+    name="treap-vs-bst",
+    # The dotted Extension name makes build_ext --inplace drop the .so
+    # in src/Treap/ (namespace package, no __init__.py), where
+    # `from src.Treap._treap import Treap` actually finds it; a bare
+    # cythonize(path) would name the module `_treap` and leave the
+    # artifact at the repo root, never imported.
+    ext_modules=cythonize(
+        [Extension("src.Treap._treap", ["src/Treap/_treap.pyx"])],
+        # No wraparound=False: _treap.pyx indexes Python lists with [-1]
+        # (rightmost-spine peeks), which that directive would turn into
+        # out-of-bounds accesses.
+        compiler_directives={
+            "language_level": 3,
+            "boundscheck": False,
+        },
+    ),
+)
@@ -0,0 +1,52 @@
+"""
+Numba-compiled kernel for ArrayBST.
+The SoA insert loop is pure int64/int32 index arithmetic -- exactly the
+workload @njit compiles to native code -- so one call ingests a whole
+decoded batch with zero interpreter overhead per record.
+Importing this module requires numba; callers guard with try/except.
+"""
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def insert_many(ts, score, left, right, ts_in, score_in, root, n_used, max_depth):
+    """
+    Inserts a batch of (timestamp, score) records into the SoA arrays.
+    The caller must have grown the arrays to hold the batch already.
+    Tracks the deepest descent so height reporting needs no extra pass.
+    Returns the updated (root, n_used, max_depth).
+    """
+    for i in range(ts_in.size):
+        t = ts_in[i]
+        node = n_used
+        ts[node] = t
+        score[node] = score_in[i]
+        left[node] = -1
+        right[node] = -1
+        n_used += 1
+
+        if root == -1:
+            root = node
+            if max_depth < 1:
+                max_depth = 1
+            continue
+
+        cur = root
+        depth = 1
+        while True:
+            if t < ts[cur]:
+                nxt = left[cur]
+                if nxt == -1:
+                    left[cur] = node
+                    break
+            else:
+                nxt = right[cur]
+                if nxt == -1:
+                    right[cur] = node
+                    break
+            cur = nxt
+            depth += 1
+        if depth + 1 > max_depth:
+            max_depth = depth + 1
+    return root, n_used, max_depth
@@ -1,6 +1,22 @@
+import os
 import sys
 from src.Models.models import Node
 
+# NumPy is optional: only the array-backed (SoA) tree below needs it.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional Numba kernel (_bst_numba.py). This folder's name contains a
+# space, so it is imported by path -- the same trick bstMain uses to load
+# this module.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+try:
+    from _bst_numba import insert_many as _insert_many
+except ImportError:  # numba not installed; ArrayBST falls back to Python
+    _insert_many = None
+
 class BST:
     def __init__(self):
         self.root = None
@@ -8,32 +24,71 @@ class BST:
         # Performance Counters (for the Report)
         self.comparisons = 0
         self.operations_count = 0
+        # Height, maintained in O(1) per insert: the deepest level any
+        # insertion descent has reached. Makes reporting height free.
+        self.max_depth = 0
 
     def addPost(self, post_id, timestamp, score):
-        from src.Models.models import Post  # Import here to avoid circular dependencies if any
-        new_post = Post(post_id, timestamp, score)
+        new_node = Node(post_id, timestamp, score)
 
         if not self.root:
-            self.root = Node(new_post)
-        else:
-            self._insert_recursive(self.root, new_post)
-
-    def _insert_recursive(self, node, new_post):
-        self.comparisons += 1
+            self.root = new_node
+            if self.max_depth < 1: self.max_depth = 1
+            return
 
-        # STANDARD BST LOGIC: Compare only Timestamps
-        if new_post.timestamp < node.post.timestamp:
-            if node.left is None:
-                node.left = Node(new_post)
+        # Iterative descent: Reddit timestamps arrive essentially sorted,
+        # so this tree degrades to a right spine of height N -- recursion
+        # here would overflow no matter what the limit is set to.
+        node = self.root
+        depth = 1
+        while True:
+            self.comparisons += 1
+            # STANDARD BST LOGIC: Compare only Timestamps
+            if new_node.timestamp < node.timestamp:
+                if node.left is None:
+                    node.left = new_node
+                    break
+                node = node.left
             else:
-                self._insert_recursive(node.left, new_post)
-        else:
-            # If timestamp is greater OR EQUAL, go right.
-            # (Chronological feeds go right, creating the "Stick")
-            if node.right is None:
-                node.right = Node(new_post)
+                # If timestamp is greater OR EQUAL, go right.
+                # (Chronological feeds go right, creating the "Stick")
+                if node.right is None:
+                    node.right = new_node
+                    break
+                node = node.right
+            depth += 1
+        if depth + 1 > self.max_depth:
+            self.max_depth = depth + 1
+
+    def build_from_sorted(self, items):
+        """
+        Bulk-builds a BALANCED tree in O(N) from records pre-sorted by timestamp.
+        Picks the middle record as the subtree root (midpoint recursion),
+        driven by an explicit stack of (lo, hi, parent, side) ranges, so there
+        is no comparison descent and no recursion depth to worry about.
+        Assumes the tree is empty; items are (post_id, timestamp, score) tuples.
+        """
+        if not items:
+            return
+
+        stack = [(0, len(items) - 1, None, None, 1)]
+        while stack:
+            lo, hi, parent, side, depth = stack.pop()
+            if lo > hi:
+                continue
+            mid = (lo + hi) // 2
+            pid, ts, score = items[mid]
+            node = Node(pid, ts, score)
+            if parent is None:
+                self.root = node
+            elif side == 'L':
+                parent.left = node
             else:
-                self._insert_recursive(node.right, new_post)
+                parent.right = node
+            if depth > self.max_depth:
+                self.max_depth = depth
+            stack.append((lo, mid - 1, node, 'L', depth + 1))
+            stack.append((mid + 1, hi, node, 'R', depth + 1))
 
     def likePost(self, post_id):
         """
@@ -43,113 +98,259 @@ class BST:
         """
         target_node = self._search_by_id(self.root, post_id)
         if target_node:
-            target_node.post.score += 1
+            target_node.score += 1
             # No re-balancing logic here!
             return True
         return False
 
-    def deletePost(self, post_id):
-        # This is tricky in a Time-ordered BST because we are deleting by ID.
-        # We have to search the whole tree to find the node, then delete it.
-        self.root = self._delete_recursive(self.root, post_id)
+    def _search_by_id(self, node, post_id):
+        # Helper: O(N) search because BST is not ordered by ID.
+        # Explicit-stack DFS -- stick-shaped trees are too deep to recurse.
+        stack = [node] if node else []
+        while stack:
+            n = stack.pop()
+            if n.post_id == post_id:
+                return n
+            if n.left: stack.append(n.left)
+            if n.right: stack.append(n.right)
+        return None
 
-    def _delete_recursive(self, node, post_id):
+    def deletePost(self, post_id):
+        """
+        This is tricky in a Time-ordered BST because we are deleting by ID:
+        we must search the whole tree to find the node (O(N) weakness for
+        the report), then do a standard BST delete. The search carries
+        (node, parent) pairs on an explicit stack so the parent's child
+        slot can be re-linked without recursion.
+        """
+        stack = [(self.root, None)] if self.root else []
+        node = parent = None
+        while stack:
+            n, p = stack.pop()
+            if n.post_id == post_id:
+                node, parent = n, p
+                break
+            if n.left: stack.append((n.left, n))
+            if n.right: stack.append((n.right, n))
         if node is None:
-            return None
-
-        # 1. Search Phase (Since we don't know the Timestamp, we must look everywhere)
-        # Note: This O(N) traversal is a major weakness you will report.
-        if node.post.post_id == post_id:
-            # Found it! Perform Standard BST Delete
-
-            # Case 1: No children (Leaf)
-            if node.left is None and node.right is None:
-                return None
-
-            # Case 2: One child
-            if node.left is None: return node.right
-            if node.right is None: return node.left
-
-            # Case 3: Two children
-            # Find In-order Successor (Smallest in Right Subtree)
-            temp = self._get_min_node(node.right)
-            # Copy data
-            node.post = temp.post
-            node.priority = temp.priority  # Keep consistency
-            # Delete the successor
-            node.right = self._delete_recursive_by_obj(node.right, temp)
-            return node
-
-        # If not found yet, keep looking
-        # Optimization: If we knew the timestamp, we could search O(log N).
-        # But we only have ID. So we must recursively check both sides or use a helper map.
-        # For this assignment, we recursively update links.
-        node.left = self._delete_recursive(node.left, post_id)
-        node.right = self._delete_recursive(node.right, post_id)
-        return node
-
-    def _delete_recursive_by_obj(self, node, target_node):
-        # Helper to remove the specific successor object
-        if node is None: return None
-        if node == target_node:
-            return node.right
-        node.left = self._delete_recursive_by_obj(node.left, target_node)
-        return node
-
-    def _get_min_node(self, node):
-        current = node
-        while current.left is not None:
-            current = current.left
-        return current
+            return
 
-    def _search_by_id(self, node, post_id):
-        # Helper: O(N) search because BST is not ordered by ID
-        if not node: return None
-        if node.post.post_id == post_id: return node
+        if node.left and node.right:
+            # Two children: copy the in-order successor (leftmost of the
+            # right subtree) into place, then unlink the successor -- it
+            # cannot have a left child.
+            succ_parent, succ = node, node.right
+            while succ.left:
+                succ_parent, succ = succ, succ.left
+            node.post_id = succ.post_id
+            node.timestamp = succ.timestamp
+            node.score = succ.score
+            node.priority = succ.priority  # Keep consistency
+            if succ_parent.left is succ:
+                succ_parent.left = succ.right
+            else:
+                succ_parent.right = succ.right
+            return
 
-        res1 = self._search_by_id(node.left, post_id)
-        if res1: return res1
-        return self._search_by_id(node.right, post_id)
+        # Zero or one child: splice the child (possibly None) into the
+        # parent's slot.
+        child = node.left if node.left else node.right
+        if parent is None:
+            self.root = child
+        elif parent.left is node:
+            parent.left = child
+        else:
+            parent.right = child
 
     def getMostPopular(self):
         """
-        Finds the post with highest score.
+        Finds the post (Node) with highest score.
         BST WEAKNESS: Must scan O(N) nodes because max score
         could be anywhere.
         """
         if not self.root: return None
 
-        self.max_post = self.root.post
-        self._find_max_score_recursive(self.root)
-        return self.max_post
-
-    def _find_max_score_recursive(self, node):
-        if not node: return
-        if node.post.score > self.max_post.score:
-            self.max_post = node.post
-
-        self._find_max_score_recursive(node.left)
-        self._find_max_score_recursive(node.right)
+        best = self.root
+        stack = [self.root]
+        while stack:
+            n = stack.pop()
+            if n.score > best.score:
+                best = n
+            if n.left: stack.append(n.left)
+            if n.right: stack.append(n.right)
+        return best
 
     def getMostRecent(self, k):
         """
         Returns k-most recent posts.
-        Efficient! This is Reverse In-Order Traversal (Right -> Root -> Left).
+        Efficient! This is Reverse In-Order Traversal (Right -> Root ->
+        Left), done with an explicit stack and an early exit as soon as k
+        posts are collected -- only the rightmost O(k + height) nodes are
+        ever touched.
         """
-        results = []
-        self._reverse_inorder(self.root, k, results)
-        return results
+        # Preallocated result slots + a local fill counter: index stores
+        # instead of amortized appends, and the loop guard is an int
+        # compare rather than a len() call per visit.
+        results = [None] * k
+        i = 0
+        stack = []
+        node = self.root
+        while (stack or node) and i < k:
+            while node:  # push the right spine (newest first)
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
+            results[i] = node
+            i += 1
+            node = node.left
+        return results[:i]
+
+class ArrayBST:
+    """
+    Struct-of-Arrays BST.
+    Instead of one Python Node object per post (~200+ bytes of header,
+    __dict__ and payload, scattered across the heap), nodes live in
+    parallel NumPy arrays indexed by an integer node id:
+    - ts[i]    : timestamp (the BST key), int64
+    - score[i] : score, int64
+    - left[i]  : index of left child, int32 (-1 == no child)
+    - right[i] : index of right child, int32 (-1 == no child)
+    post_ids is a plain Python list indexed by the same node id.
+    Same algorithm as BST, but each hop reads a small int from a
+    contiguous array instead of chasing a PyObject pointer, and
+    consecutively inserted nodes are adjacent in memory.
+    """
+
+    def __init__(self, capacity=1024):
+        if np is None:
+            raise ImportError("ArrayBST requires numpy")
+        capacity = max(int(capacity), 1)
+        self.ts = np.empty(capacity, dtype=np.int64)
+        self.score = np.empty(capacity, dtype=np.int64)
+        self.left = np.full(capacity, -1, dtype=np.int32)
+        self.right = np.full(capacity, -1, dtype=np.int32)
+        self.post_ids = []
+        self.root = -1
+        self.n_used = 0
+        self.comparisons = 0
+        # Height, maintained in O(1) per insert (deepest descent seen), so
+        # reporting it needs no O(N) traversal afterwards.
+        self.max_depth = 0
+
+    def _grow(self):
+        # Double capacity, preserving contents (-1 fill for the child arrays).
+        old = len(self.ts)
+        new_cap = old * 2
+        for name in ('ts', 'score'):
+            arr = np.empty(new_cap, dtype=np.int64)
+            arr[:old] = getattr(self, name)
+            setattr(self, name, arr)
+        for name in ('left', 'right'):
+            arr = np.full(new_cap, -1, dtype=np.int32)
+            arr[:old] = getattr(self, name)
+            setattr(self, name, arr)
 
-    def _reverse_inorder(self, node, k, results):
-        if not node or len(results) >= k:
+    def addPost(self, post_id, timestamp, score):
+        if self.n_used >= len(self.ts):
+            self._grow()
+        i = self.n_used
+        ts, left, right = self.ts, self.left, self.right
+        ts[i] = timestamp
+        self.score[i] = score
+        self.post_ids.append(post_id)
+        self.n_used = i + 1
+
+        if self.root == -1:
+            self.root = i
+            if self.max_depth < 1: self.max_depth = 1
             return
 
-        # 1. Go Right (Newest)
-        self._reverse_inorder(node.right, k, results)
+        # Tight index-walking descent (no objects, no recursion).
+        cur = self.root
+        comparisons = 0
+        while True:
+            comparisons += 1
+            if timestamp < ts[cur]:
+                nxt = left[cur]
+                if nxt == -1:
+                    left[cur] = i
+                    break
+            else:
+                nxt = right[cur]
+                if nxt == -1:
+                    right[cur] = i
+                    break
+            cur = nxt
+        self.comparisons += comparisons
+        # The new node sits one level below the last compared node.
+        if comparisons + 1 > self.max_depth:
+            self.max_depth = comparisons + 1
 
-        # 2. Visit Node
-        if len(results) < k:
-            results.append(node.post)
+    def add_many(self, post_ids, timestamps, scores):
+        """
+        Inserts a whole decoded batch in one call.
+        With numba installed, the descent loop runs as native code via the
+        insert_many kernel (~tens of ns per record instead of microseconds);
+        otherwise it falls back to per-record addPost. timestamps/scores can
+        be any int sequences; post_ids stay Python-side.
+        """
+        n = len(post_ids)
+        while self.n_used + n > len(self.ts):
+            self._grow()
+
+        if _insert_many is None:
+            for pid, t, s in zip(post_ids, timestamps, scores):
+                self.addPost(pid, t, s)
+            return
+
+        ts_in = np.ascontiguousarray(timestamps, dtype=np.int64)
+        score_in = np.ascontiguousarray(scores, dtype=np.int64)
+        self.post_ids.extend(post_ids)
+        self.root, self.n_used, self.max_depth = _insert_many(
+            self.ts, self.score, self.left, self.right,
+            ts_in, score_in, self.root, self.n_used, self.max_depth)
+
+    def build_from_sorted(self, post_ids, timestamps, scores):
+        """
+        Bulk-builds a BALANCED tree in O(N) from columns pre-sorted by
+        timestamp. An explicit stack of (lo, hi, parent, side) ranges picks
+        each range's midpoint as the subtree root, so height collapses to
+        ceil(log2 N) even on the chronologically sorted Reddit stream that
+        would otherwise produce a depth-N 'stick'. No comparison descent,
+        no recursion. Assumes the tree is empty.
+        """
+        n = len(post_ids)
+        if n == 0:
+            return
+        while self.n_used + n > len(self.ts):
+            self._grow()
+
+        base = self.n_used
+        ts, sc = self.ts, self.score
+        left, right = self.left, self.right
+
+        stack = [(0, n - 1, -1, False)]
+        while stack:
+            lo, hi, parent, is_left = stack.pop()
+            if lo > hi:
+                continue
+            mid = (lo + hi) // 2
+            node = base + mid  # node id == position in sorted order
+            ts[node] = timestamps[mid]
+            sc[node] = scores[mid]
+            left[node] = -1
+            right[node] = -1
+            if parent == -1:
+                self.root = node
+            elif is_left:
+                left[parent] = node
+            else:
+                right[parent] = node
+            stack.append((lo, mid - 1, node, True))
+            stack.append((mid + 1, hi, node, False))
 
-        # 3. Go Left (Older)
-        self._reverse_inorder(node.left, k, results)
\ No newline at end of file
+        self.post_ids.extend(post_ids)
+        self.n_used = base + n
+        # Midpoint construction of n nodes has height floor(log2 n) + 1.
+        if n.bit_length() > self.max_depth:
+            self.max_depth = n.bit_length()
@@ -0,0 +1,17 @@
+"""
+Import alias for the "Binary Search Tree" folder, whose space-containing
+name cannot appear in an import statement.
+
+The mains used to load bst.py through importlib.util.spec_from_file_location,
+which bypasses sys.modules and re-executes the module on every load.
+Going through this package instead means module init runs once per process
+and repeated imports (Jupyter/Kaggle notebooks re-running mains) hit the
+import cache.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'Binary Search Tree'))
+
+from bst import BST, ArrayBST  # noqa: E402
@@ -1,34 +1,69 @@
-class Post:
-    """
-    Represents a single social media post.
-    This object is the 'Payload' stored inside our Tree Nodes.
-    """
-
-    def __init__(self, post_id, timestamp, score):
-        self.post_id = str(post_id)  # Unique ID (e.g., "ejualnb")
-        self.timestamp = int(timestamp)  # The Key for BST ordering (Time)
-        self.score = int(score)  # The Priority for Treap balancing (Popularity)
-
-    def __repr__(self):
-        # formatted for easy reading: (ID, Time, Score)
-        return f"('{self.post_id}', {self.timestamp}, {self.score})"
-
-
 class Node:
     """
-    A generic Tree Node that works for both BST and Treap.
+    A single flat tree node shared by the BST and the Treap.
+    The old Post payload is folded straight into the node: the separate
+    Post object cost one extra allocation (+ __dict__) per record and one
+    pointer hop (node.post.timestamp) on the hottest comparison in insert.
+    __slots__ drops the per-instance __dict__ too, roughly halving memory
+    per node -- at 100k+ nodes the workload is memory-bound, so a smaller
+    working set keeps more of the tree in cache.
+
+    Fields:
+    - post_id   : Unique ID (e.g., "ejualnb")
+    - timestamp : The Key for BST ordering (Time)
+    - score     : Popularity (the BST updates this without rotating)
+    - priority  : The Treap's Max-Heap priority (tracks score)
+    - left/right: Children
+    - parent    : Upward link (Treap only; None in the BST)
     """
+    __slots__ = ('post_id', 'timestamp', 'score', 'priority', 'left', 'right',
+                 'parent')
 
-    def __init__(self, post):
-        self.post = post  # The data payload
-        self.left = None  # Left Child
-        self.right = None  # Right Child
+    # Freelist of released nodes, shared by all trees. Deleting and
+    # re-inserting posts then reuses warm objects instead of round-tripping
+    # through the CPython allocator. Capped so steady-state memory stays
+    # bounded (~2x one partition of partitionMain).
+    _pool = []
+    _POOL_CAP = 200000
 
-        # TREAP SPECIFIC:
-        self.priority = post.score
+    @classmethod
+    def alloc(cls, post_id, timestamp, score):
+        """Returns a recycled node from the pool if one is available."""
+        if cls._pool:
+            n = cls._pool.pop()
+            n.post_id = post_id
+            n.timestamp = timestamp
+            n.score = score
+            n.priority = score
+            n.left = None
+            n.right = None
+            n.parent = None
+            return n
+        return cls(post_id, timestamp, score)
 
-        # METRICS & UTILS:
-        self.height = 1
+    @classmethod
+    def release(cls, node):
+        """Returns a detached node to the pool (dropped if the pool is full)."""
+        if len(cls._pool) < cls._POOL_CAP:
+            node.left = None
+            node.right = None
+            node.parent = None
+            cls._pool.append(node)
+
+    # No str()/int() coercion here: the streaming layer already yields a
+    # str id and int timestamp/score (cast once at parse time), and these
+    # three calls per node add up over millions of inserts.
+    def __init__(self, post_id, timestamp, score):
+        self.post_id = post_id
+        self.timestamp = timestamp
+        self.score = score
+        self.priority = score
+        self.left = None
+        self.right = None
+        # Maintained by the Treap only: enables O(log N) bubble-up from a
+        # node found via the _by_id index, with no path recording.
+        self.parent = None
 
     def __repr__(self):
-        return f"Node({self.post})"
\ No newline at end of file
+        # formatted for easy reading: (ID, Time, Score)
+        return f"Node('{self.post_id}', {self.timestamp}, {self.score})"
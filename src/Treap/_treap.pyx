@@ -0,0 +1,410 @@
+# cython: language_level=3, boundscheck=False
+# wraparound stays ON: the spine/merge loops index Python lists with
+# [-1], which wraparound=False would compile to an out-of-bounds
+# PyList_GET_ITEM (a segfault, not an exception). The directive buys
+# nothing here anyway -- all hot indexing is on object lists, not
+# typed memoryviews.
+"""
+Compiled version of the pure-Python treap (treap.py), built via
+`python setup.py build_ext --inplace`. Same API and the same semantics:
+independent xorshift64 priorities (likes never rotate), a _by_id index,
+a tracked _top pointer for getMostPopular, and size-aware union. Node is
+a cdef class with typed C fields, so the hot descent/rotation loops run
+without interpreter dispatch or boxed-int comparisons -- rotations
+become plain pointer swaps. treap.py imports this module when the
+extension is present and silently falls back to the Python classes
+otherwise.
+"""
+import random
+
+# xorshift64 state for priority generation; unsigned arithmetic wraps
+# for free in C, no masking needed. Seeded from the stdlib RNG; the |1
+# keeps the state out of xorshift's zero fixpoint.
+cdef unsigned long long _rng_state = <unsigned long long>random.getrandbits(64) | 1
+
+
+cdef inline long long _new_priority():
+    # Independent random priority, 63-bit so the signed compare is safe.
+    global _rng_state
+    cdef unsigned long long x = _rng_state
+    x ^= x << 13
+    x ^= x >> 7
+    x ^= x << 17
+    _rng_state = x
+    return <long long>(x >> 1)
+
+
+cdef class Node:
+    # post_id is an int64 base36-decoded Reddit id at ingest, but stays
+    # an object slot so string ids keep working too.
+    cdef public object post_id
+    cdef public long long timestamp
+    cdef public long long score
+    cdef public long long priority
+    cdef public Node left
+    cdef public Node right
+    cdef public Node parent
+
+    def __init__(self, post_id, timestamp, score):
+        self.post_id = post_id
+        self.timestamp = timestamp
+        self.score = score
+        self.priority = 0
+        self.left = None
+        self.right = None
+        self.parent = None
+
+    def __repr__(self):
+        return f"Node('{self.post_id}', {self.timestamp}, {self.score})"
+
+
+cdef class Treap:
+    cdef public Node root
+    cdef public dict _by_id
+    cdef public Node _top
+    cdef public long long size
+    cdef public long long rotations_count
+    cdef public long long comparisons
+
+    def __init__(self):
+        self.root = None
+        self._by_id = {}
+        self._top = None
+        self.size = 0
+        self.rotations_count = 0
+        self.comparisons = 0
+
+    # ------------------------------------------------------------------
+    # Rotations (parent links maintained; caller patches the grandparent)
+    # ------------------------------------------------------------------
+    cdef Node _right_rotate(self, Node y):
+        cdef Node x = y.left
+        cdef Node t2 = x.right
+        self.rotations_count += 1
+        x.right = y
+        y.left = t2
+        x.parent = y.parent
+        y.parent = x
+        if t2 is not None: t2.parent = y
+        return x
+
+    cdef Node _left_rotate(self, Node x):
+        cdef Node y = x.right
+        cdef Node t2 = y.left
+        self.rotations_count += 1
+        y.left = x
+        x.right = t2
+        y.parent = x.parent
+        x.parent = y
+        if t2 is not None: t2.parent = x
+        return y
+
+    cdef void _bubble_up(self, Node node):
+        # Rotations inlined (four pointer writes each); count flushed once.
+        cdef Node parent = node.parent
+        cdef Node gp, t2
+        cdef long long rot = 0
+        cdef long long prio = node.priority
+        while parent is not None and prio > parent.priority:
+            gp = parent.parent
+            if parent.left is node:
+                t2 = node.right
+                node.right = parent
+                parent.left = t2
+            else:
+                t2 = node.left
+                node.left = parent
+                parent.right = t2
+            if t2 is not None: t2.parent = parent
+            node.parent = gp
+            parent.parent = node
+            rot += 1
+            if gp is None:
+                self.root = node
+            elif gp.left is parent:
+                gp.left = node
+            else:
+                gp.right = node
+            parent = gp
+        if rot:
+            self.rotations_count += rot
+
+    # ------------------------------------------------------------------
+    # Core operations
+    # ------------------------------------------------------------------
+    def addPost(self, post_id, timestamp, score):
+        cdef Node new_node = Node(post_id, timestamp, score)
+        new_node.priority = _new_priority()
+        self._by_id[new_node.post_id] = new_node
+        self.size += 1
+        cdef Node top = self._top
+        if top is not None and new_node.score > top.score:
+            self._top = new_node
+        elif self.size == 1:
+            self._top = new_node
+        if self.root is None:
+            self.root = new_node
+            return
+
+        cdef Node node = self.root
+        cdef long long ts = new_node.timestamp
+        cdef long long comps = 0
+        while True:
+            comps += 1
+            if ts < node.timestamp:
+                if node.left is None:
+                    node.left = new_node
+                    break
+                node = node.left
+            else:
+                if node.right is None:
+                    node.right = new_node
+                    break
+                node = node.right
+        self.comparisons += comps
+        new_node.parent = node
+        self._bubble_up(new_node)
+
+    def build_from_sorted(self, items):
+        # Linear Cartesian-tree construction over timestamp-sorted items.
+        cdef list spine = []
+        cdef Node node, last_popped
+        cdef dict by_id = self._by_id
+        for post_id, timestamp, score in items:
+            node = Node(post_id, timestamp, score)
+            node.priority = _new_priority()
+            by_id[node.post_id] = node
+            last_popped = None
+            while spine and (<Node>spine[-1]).priority < node.priority:
+                last_popped = <Node>spine.pop()
+            node.left = last_popped
+            if last_popped is not None:
+                last_popped.parent = node
+            if spine:
+                (<Node>spine[-1]).right = node
+                node.parent = <Node>spine[-1]
+            spine.append(node)
+            self.size += 1
+        if spine:
+            self.root = <Node>spine[0]
+        # Bulk paths do not track the top post; recomputed on demand.
+        self._top = None
+
+    def likePost(self, post_id):
+        # Priorities are independent of scores: a like never rotates.
+        cdef Node node = self._by_id.get(post_id)
+        if node is None:
+            return False
+        node.score += 1
+        cdef Node top = self._top
+        if top is not None and node.score > top.score:
+            self._top = node
+        return True
+
+    def deletePost(self, post_id):
+        cdef Node node = self._by_id.pop(post_id, None)
+        if node is None:
+            return
+        self.size -= 1
+        if node is self._top:
+            self._top = None  # recomputed lazily by getMostPopular
+
+        # Rotate down with the higher-priority child until leaf, inlined.
+        cdef Node parent = node.parent
+        cdef Node child, t2, l, r
+        cdef long long rot = 0
+        while True:
+            l = node.left
+            r = node.right
+            if l is None and r is None:
+                break
+            if l is not None and (r is None or l.priority > r.priority):
+                child = l
+                t2 = l.right
+                l.right = node
+                node.left = t2
+            else:
+                child = r
+                t2 = r.left
+                r.left = node
+                node.right = t2
+            if t2 is not None: t2.parent = node
+            child.parent = parent
+            node.parent = child
+            rot += 1
+            if parent is None:
+                self.root = child
+            elif parent.left is node:
+                parent.left = child
+            else:
+                parent.right = child
+            parent = child
+        if rot:
+            self.rotations_count += rot
+
+        if parent is None:
+            self.root = None
+        elif parent.left is node:
+            parent.left = None
+        else:
+            parent.right = None
+
+    def getMostPopular(self):
+        # Served from the tracked pointer; one _by_id scan rebuilds it
+        # after the top post was deleted or a bulk build/union.
+        cdef Node best, node
+        if self._top is None and self._by_id:
+            best = None
+            for node in self._by_id.values():
+                if best is None or node.score > best.score:
+                    best = node
+            self._top = best
+        return self._top
+
+    def getMostRecent(self, k):
+        # Iterative reverse in-order with early exit and a preallocated
+        # result list.
+        cdef list results = [None] * k
+        cdef list stack = []
+        cdef Py_ssize_t i = 0
+        cdef Node node = self.root
+        while (stack or node is not None) and i < k:
+            while node is not None:
+                stack.append(node)
+                node = node.right
+            node = <Node>stack.pop()
+            results[i] = node
+            i += 1
+            node = node.left
+        return results[:i]
+
+    # ------------------------------------------------------------------
+    # Union & split
+    # ------------------------------------------------------------------
+    def split(self, Node root, long long key):
+        # Two-spine splice: one descent, no path list.
+        cdef Node left_root = None, right_root = None
+        cdef Node left_tail = None, right_tail = None
+        cdef Node node = root
+        while node is not None:
+            if node.timestamp <= key:
+                if left_tail is None:
+                    left_root = node
+                    node.parent = None
+                else:
+                    left_tail.right = node
+                    node.parent = left_tail
+                left_tail = node
+                node = node.right
+            else:
+                if right_tail is None:
+                    right_root = node
+                    node.parent = None
+                else:
+                    right_tail.left = node
+                    node.parent = right_tail
+                right_tail = node
+                node = node.left
+        if left_tail is not None: left_tail.right = None
+        if right_tail is not None: right_tail.left = None
+        return left_root, right_root
+
+    def union(self, other_treap):
+        if other_treap is None or other_treap.root is None:
+            return
+        cdef long long m = other_treap.size
+        cdef long long n = self.size
+        if self.root is not None and min(m, n) * 4 >= max(m, n):
+            merged = _merge_sorted(_flatten(self.root),
+                                   _flatten(other_treap.root))
+            self.root = self._rebuild_from_nodes(merged)
+        else:
+            self.root = self._union_iterative(self.root, other_treap.root)
+        self._by_id.update(other_treap._by_id)
+        self.size = n + m
+        self.rotations_count += other_treap.rotations_count
+        # Merge the popularity pointers; if either side's is stale (None),
+        # fall back to the lazy recompute.
+        cdef Node a = self._top
+        cdef Node b = other_treap._top
+        if a is not None and b is not None:
+            self._top = b if b.score > a.score else a
+        else:
+            self._top = None
+
+    cdef Node _rebuild_from_nodes(self, list nodes):
+        cdef list spine = []
+        cdef Node node, last_popped
+        for node in nodes:
+            node.right = None
+            node.parent = None
+            last_popped = None
+            while spine and (<Node>spine[-1]).priority < node.priority:
+                last_popped = <Node>spine.pop()
+            node.left = last_popped
+            if last_popped is not None:
+                last_popped.parent = node
+            if spine:
+                (<Node>spine[-1]).right = node
+                node.parent = <Node>spine[-1]
+            spine.append(node)
+        return <Node>spine[0] if spine else None
+
+    cdef Node _union_iterative(self, Node t1, Node t2):
+        cdef Node result_root = None
+        cdef Node a, b, parent, sub, left_b, right_b
+        cdef list stack = [(t1, t2, None, 0)]  # (a, b, parent, side)
+        cdef int side
+        while stack:
+            a, b, parent, side = stack.pop()
+            if a is None:
+                sub = b
+            elif b is None:
+                sub = a
+            else:
+                if a.priority < b.priority:
+                    a, b = b, a
+                left_b, right_b = self.split(b, a.timestamp)
+                stack.append((a.left, left_b, a, 0))
+                stack.append((a.right, right_b, a, 1))
+                sub = a
+
+            if parent is None:
+                result_root = sub
+                if sub is not None: sub.parent = None
+            elif side == 0:
+                parent.left = sub
+                if sub is not None: sub.parent = parent
+            else:
+                parent.right = sub
+                if sub is not None: sub.parent = parent
+        return result_root
+
+
+cdef list _flatten(Node root):
+    # Iterative inorder walk -> nodes in timestamp order.
+    cdef list out = []
+    cdef list stack = []
+    cdef Node node = root
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = <Node>stack.pop()
+        out.append(node)
+        node = node.right
+    return out
+
+
+cdef list _merge_sorted(list a, list b):
+    cdef list merged = []
+    cdef Py_ssize_t i = 0, j = 0
+    cdef Py_ssize_t na = len(a), nb = len(b)
+    while i < na and j < nb:
+        if (<Node>a[i]).timestamp <= (<Node>b[j]).timestamp:
+            merged.append(a[i]); i += 1
+        else:
+            merged.append(b[j]); j += 1
+    merged.extend(a[i:])
+    merged.extend(b[j:])
+    return merged
@@ -1,26 +1,76 @@
+import random
 import sys
 # Standard imports with fallback for different folder structures
 try:
-    from src.Models.models import Node, Post
+    from src.Models.models import Node
 except ImportError:
-    from src.models.models import Node, Post
+    from src.models.models import Node
+
+# xorshift64 state for priority generation. One 64-bit word of state and
+# three shift-xors per draw -- far cheaper than the Mersenne Twister --
+# and the quality is more than enough for treap balancing. Seeded from
+# the stdlib RNG; the |1 keeps the state out of xorshift's zero fixpoint.
+_rng_state = random.getrandbits(64) | 1
+
+
+def _xorshift64():
+    global _rng_state
+    x = _rng_state
+    x ^= (x << 13) & 0xFFFFFFFFFFFFFFFF
+    x ^= x >> 7
+    x ^= (x << 17) & 0xFFFFFFFFFFFFFFFF
+    _rng_state = x
+    return x
+
+
+def _new_priority():
+    """
+    Independent random priority (63 bits, so it also fits an int64
+    array slot in the SoA variant). Deliberately NOT a function of
+    the score: tying priority to score forces rotations on every
+    like and lets the heavy-tailed Reddit score distribution (a huge
+    mass of equal 0/1 scores) degenerate the tree.
+    Module-level so it is the single policy point for every per-node
+    draw (Treap and ArrayTreap alike), and still reachable when the
+    compiled extension shadows the Treap class at the module tail.
+    """
+    return _xorshift64() >> 1
+
 
 class Treap:
     """
     A Randomized Binary Search Tree (Treap) Data Structure.
-    
+
     Theoretical Foundation:
     - Acts as a BST with respect to the 'Timestamp' (Key).
-    - Acts as a Max-Heap with respect to the 'Score' (Priority).
-    - Probabilistic Balancing: Random/Arbitrary scores ensure O(log N) height 
-      with high probability, preventing degeneration into a linked list.
+    - Acts as a Max-Heap with respect to a random Priority. Priorities are
+      independent xorshift64 draws, NOT derived from the score: that is
+      what makes the treap invariant hold -- likes mutate the score
+      without touching the structure, so likePost never rotates and the
+      expected O(log N) height is immune to update churn.
+    - The most popular post is tracked separately in self._top (updated
+      on insert/like, recomputed lazily after it is deleted), keeping
+      getMostPopular O(1) without tying the heap to the score.
     """
     def __init__(self):
         self.root = None
+        # Side index: post_id -> Node. The tree is keyed by timestamp, so
+        # without this every by-ID operation (like, delete) would be an
+        # O(N) scan; with it, find is one hash lookup and the structural
+        # work is the O(log N) part.
+        self._by_id = {}
+        self.size = 0  # node count; lets union pick its merge strategy
+        # Highest-score node, or None when empty OR invalidated (after
+        # deleting the top / a union); getMostPopular recomputes lazily.
+        self._top = None
         # Performance Counters for Ablation Study
         self.rotations_count = 0  # Measures structural volatility
         self.comparisons = 0      # Measures search cost
 
+    # Exposed on the class for external callers; the module-level
+    # function above is the actual policy point.
+    _new_priority = staticmethod(_new_priority)
+
     # ==========================================
     # 1. CORE ROTATION LOGIC (O(1))
     # ==========================================
@@ -34,11 +84,15 @@ class Treap:
         self.rotations_count += 1
         x = y.left
         T2 = x.right
-        
-        # Rotation steps
+
+        # Rotation steps (parent links maintained; the caller re-points
+        # the grandparent's child slot at x)
         x.right = y
         y.left = T2
-        
+        x.parent = y.parent
+        y.parent = x
+        if T2: T2.parent = y
+
         return x # New root of this subtree
 
     def _left_rotate(self, x):
@@ -51,11 +105,15 @@ class Treap:
         self.rotations_count += 1
         y = x.right
         T2 = y.left
-        
-        # Rotation steps
+
+        # Rotation steps (parent links maintained; the caller re-points
+        # the grandparent's child slot at y)
         y.left = x
         x.right = T2
-        
+        y.parent = x.parent
+        x.parent = y
+        if T2: T2.parent = x
+
         return y # New root of this subtree
 
     # ==========================================
@@ -64,77 +122,152 @@ class Treap:
     def addPost(self, post_id, timestamp, score):
         """
         Inserts a new post.
-        1. Standard BST insert based on Timestamp.
-        2. 'Bubble Up' (Reheapify) using rotations if Score violates Max-Heap.
+        1. Standard BST insert based on Timestamp (iterative descent -- no
+           Python frame per level).
+        2. 'Bubble Up' (Reheapify) using rotations if the random
+           priority violates Max-Heap, climbing the parent links. Early
+           exit: once one ancestor satisfies the heap property, none
+           above it can be violated.
         """
-        new_post = Post(post_id, timestamp, score)
-        self.root = self._insert_recursive(self.root, new_post)
+        new_node = Node.alloc(post_id, timestamp, score)
+        new_node.priority = _new_priority()
+        self._by_id[new_node.post_id] = new_node
+        self.size += 1
+        # Keep the popularity pointer current. A None _top with a
+        # non-empty tree means "invalidated"; leave it for the lazy
+        # recompute in getMostPopular, which will see this node too.
+        top = self._top
+        if top is not None and score > top.score:
+            self._top = new_node
+        elif self.size == 1:
+            self._top = new_node
+        if not self.root:
+            self.root = new_node
+            return
 
-    def _insert_recursive(self, node, new_post):
-        # 1. Base Case: Found empty spot, insert leaf
-        if not node: 
-            return Node(new_post)
-        
-        self.comparisons += 1
-        
-        # 2. BST Logic: Navigate by Timestamp
-        if new_post.timestamp < node.post.timestamp:
-            node.left = self._insert_recursive(node.left, new_post)
-            
-            # 3. Heap Logic: Check Priority & Rotate
-            if node.left.priority > node.priority:
-                node = self._right_rotate(node)
-        else:
-            node.right = self._insert_recursive(node.right, new_post)
-            
-            # 3. Heap Logic: Check Priority & Rotate
-            if node.right.priority > node.priority:
-                node = self._left_rotate(node)
-                
-        return node
+        # 1. BST descent by timestamp. The key is hoisted into a local
+        # once (timestamp lives directly on Node, so each level is a
+        # single LOAD_ATTR) and the comparison counter is kept in a local
+        # and flushed after the loop instead of a per-level attribute
+        # read-modify-write on self.
+        timestamp = new_node.timestamp
+        node = self.root
+        comps = 0
+        while True:
+            comps += 1
+            if timestamp < node.timestamp:
+                if node.left is None:
+                    node.left = new_node
+                    break
+                node = node.left
+            else:
+                if node.right is None:
+                    node.right = new_node
+                    break
+                node = node.right
+        self.comparisons += comps
+        new_node.parent = node
+
+        # 2. Heap fix-up: rotate the new node above each parent it
+        # outranks, re-linking the grandparent (or root) slot.
+        self._bubble_up(new_node)
+
+    def _bubble_up(self, node):
+        """
+        Restores the Max-Heap property by rotating node up while it
+        outranks its parent (the rotations keep all parent links valid).
+        Called from addPost only -- likes no longer touch priorities,
+        so nothing else re-heapifies. The rotation bodies are inlined
+        here -- a rotation around the climbing node is four pointer
+        writes, and the method-call + counter-attribute overhead of
+        _right_rotate/_left_rotate was a large fraction of that; the
+        count is accumulated in a local and flushed once on exit.
+        """
+        parent = node.parent
+        rot = 0
+        prio = node.priority
+        while parent is not None and prio > parent.priority:
+            gp = parent.parent
+            if parent.left is node:
+                # Right rotation: parent adopts node's right subtree.
+                t2 = node.right
+                node.right = parent
+                parent.left = t2
+            else:
+                # Left rotation: parent adopts node's left subtree.
+                t2 = node.left
+                node.left = parent
+                parent.right = t2
+            if t2: t2.parent = parent
+            node.parent = gp
+            parent.parent = node
+            rot += 1
+            if gp is None:
+                self.root = node
+            elif gp.left is parent:
+                gp.left = node
+            else:
+                gp.right = node
+            parent = gp
+        if rot:
+            self.rotations_count += rot
+
+    def build_from_sorted(self, items):
+        """
+        Bulk-builds the treap in O(N) from records pre-sorted by timestamp,
+        using the linear Cartesian-tree construction:
+        - Maintain a stack holding the rightmost spine of the tree built so far.
+        - For each new node, pop spine nodes with lower priority; the last
+          popped subtree becomes the new node's LEFT child.
+        - The new node becomes the RIGHT child of the remaining spine top.
+        Same structure an insertion sequence would give, but with N stack
+        operations total and ZERO rotations.
+        Assumes the tree is empty; items are (post_id, timestamp, score) tuples.
+        """
+        spine = []
+        by_id = self._by_id
+        new_priority = _new_priority  # hoisted out of the loop
+        for post_id, timestamp, score in items:
+            node = Node.alloc(post_id, timestamp, score)
+            node.priority = new_priority()
+            by_id[node.post_id] = node
+            last_popped = None
+            while spine and spine[-1].priority < node.priority:
+                last_popped = spine.pop()
+            node.left = last_popped
+            if last_popped:
+                last_popped.parent = node
+            if spine:
+                spine[-1].right = node
+                node.parent = spine[-1]
+            spine.append(node)
+            self.size += 1
+        if spine:
+            self.root = spine[0]
+        # Bulk paths do not track the top post; recomputed on demand.
+        self._top = None
 
     # ==========================================
-    # 3. UPDATE (LIKE) (Expected O(log N))
+    # 3. UPDATE (LIKE) (O(1))
     # ==========================================
     def likePost(self, post_id):
         """
-        Updates a post's score.
-        Crucial distinction from BST: Changing score changes structure.
-        We must recursively check and fix the Heap Property.
+        Updates a post's score: one _by_id hash lookup, one increment,
+        one compare against the tracked top. Because priorities are
+        independent of the score, the heap property is untouched -- a
+        like NEVER rotates, which is the whole point of the treap
+        invariant (the earlier score-as-priority design turned every
+        like into a potential rotate-to-root). True O(1).
         """
-        self.root, found = self._like_recursive(self.root, post_id)
-        return found
+        node = self._by_id.get(post_id)
+        if node is None:
+            return False
 
-    def _like_recursive(self, node, post_id):
-        if not node: return None, False
-        
-        # Case 1: Node Found
-        if node.post.post_id == post_id:
-            node.post.score += 1
-            node.priority += 1 # Priority matches score
-            # Rotation check happens in the caller (unwinding recursion)
-            return node, True
-        
-        # Case 2: Search Left
-        # Note: We check both sides because we search by ID, not Timestamp
-        left_res, found = self._like_recursive(node.left, post_id)
-        if found:
-            node.left = left_res
-            # Reheapify on the way up
-            if node.left.priority > node.priority: 
-                node = self._right_rotate(node)
-            return node, True
-            
-        # Case 3: Search Right
-        right_res, found = self._like_recursive(node.right, post_id)
-        if found:
-            node.right = right_res
-            # Reheapify on the way up
-            if node.right.priority > node.priority: 
-                node = self._left_rotate(node)
-            return node, True
-            
-        return node, False
+        node.score += 1
+        top = self._top
+        if top is not None and node.score > top.score:
+            self._top = node
+        return True
 
     # ==========================================
     # 4. DELETION (Expected O(log N))
@@ -142,56 +275,108 @@ class Treap:
     def deletePost(self, post_id):
         """
         Deletes a node.
-        Strategy: Rotate the node DOWN until it becomes a leaf, then snip it.
-        """
-        self.root = self._delete_recursive(self.root, post_id)
-
-    def _delete_recursive(self, node, post_id):
-        if not node: return None
-
-        if node.post.post_id == post_id:
-            # Case A: Leaf Node - Just remove
-            if not node.left and not node.right: return None
-            
-            # Case B: Two Children - Rotate with the larger child (preserve Heap)
-            if node.left and node.right:
-                if node.left.priority > node.right.priority:
-                    node = self._right_rotate(node)
-                    node.right = self._delete_recursive(node.right, post_id)
-                else:
-                    node = self._left_rotate(node)
-                    node.left = self._delete_recursive(node.left, post_id)
-            
-            # Case C: Single Child - Rotate down
-            elif node.left:
-                node = self._right_rotate(node)
-                node.right = self._delete_recursive(node.right, post_id)
+        Strategy: Rotate the node DOWN (always with the higher-priority
+        child, preserving the Heap) until it becomes a leaf, then snip it.
+        The node comes from the _by_id index in O(1); the rotate-down loop
+        re-links the current parent slot each step, so the whole delete is
+        O(log N) expected with no recursion anywhere.
+        """
+        node = self._by_id.pop(post_id, None)
+        if node is None:
+            return
+        self.size -= 1
+        if node is self._top:
+            self._top = None  # recomputed lazily by getMostPopular
+
+        # Rotation bodies inlined, same as _bubble_up: the higher-priority
+        # child comes up with four pointer writes per step, and the
+        # rotation count is flushed once after the loop.
+        parent = node.parent
+        rot = 0
+        while True:
+            l, r = node.left, node.right
+            if l is None and r is None:
+                break
+            if l is not None and (r is None or l.priority > r.priority):
+                # Right rotation: l comes up, node adopts l's right subtree.
+                child = l
+                t2 = l.right
+                l.right = node
+                node.left = t2
+            else:
+                # Left rotation: r comes up, node adopts r's left subtree.
+                child = r
+                t2 = r.left
+                r.left = node
+                node.right = t2
+            if t2: t2.parent = node
+            child.parent = parent
+            node.parent = child
+            rot += 1
+            if parent is None:
+                self.root = child
+            elif parent.left is node:
+                parent.left = child
             else:
-                node = self._left_rotate(node)
-                node.left = self._delete_recursive(node.left, post_id)
+                parent.right = child
+            parent = child  # the rotated-up child is now the node's parent
+        if rot:
+            self.rotations_count += rot
+
+        # Snip the leaf and recycle it.
+        if parent is None:
+            self.root = None
+        elif parent.left is node:
+            parent.left = None
         else:
-            # Search Phase (Recursive Traversal)
-            if self._contains(node.left, post_id): 
-                node.left = self._delete_recursive(node.left, post_id)
-            else: 
-                node.right = self._delete_recursive(node.right, post_id)
-        return node
-
-    def _contains(self, node, post_id):
-        # Helper for search guidance (O(N) in worst case for ID search)
-        if not node: return False
-        if node.post.post_id == post_id: return True
-        return self._contains(node.left, post_id) or self._contains(node.right, post_id)
+            parent.right = None
+        Node.release(node)
 
     # ==========================================
     # 5. RETRIEVAL (O(1))
     # ==========================================
     def getMostPopular(self):
         """
-        Returns the post with the highest score.
-        Treap Advantage: This is always the Root. O(1) time.
+        Returns the post (Node) with the highest score.
+        Served from the tracked _top pointer: O(1) on the steady path.
+        After the top post is deleted (or a bulk build/union), the
+        pointer is recomputed with one pass over the _by_id index --
+        amortized O(1) as long as top deletions are rare, which they are
+        in this workload.
+        """
+        if self._top is None and self._by_id:
+            best = None
+            for node in self._by_id.values():
+                if best is None or node.score > best.score:
+                    best = node
+            self._top = best
+        return self._top
+
+    def getMostRecent(self, k):
+        """
+        Returns the k most recent posts (Node objects, newest first).
+        Reverse in-order traversal (Right -> Root -> Left) with an
+        explicit stack and an early exit the moment k posts are
+        collected -- only the rightmost O(k + height) nodes are ever
+        touched, and there is no recursion to overflow. Same shape as
+        BST.getMostRecent, so the comparison stays apples-to-apples.
         """
-        return self.root.post if self.root else None
+        # Preallocated result slots + a local fill counter: index stores
+        # instead of amortized appends, and the loop guard is an int
+        # compare rather than a len() call per visit.
+        results = [None] * k
+        i = 0
+        stack = []
+        node = self.root
+        while (stack or node) and i < k:
+            while node:  # push the right spine (newest first)
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
+            results[i] = node
+            i += 1
+            node = node.left
+        return results[:i]
 
     # ==========================================
     # 6. BONUS: UNION & SPLIT (Merge Logic)
@@ -201,46 +386,356 @@ class Treap:
         Splits a Treap into two Treaps based on Key (Timestamp):
         - Left Tree: All nodes with timestamp <= key
         - Right Tree: All nodes with timestamp > key
+        Iterative two-spine splice: ONE descent, appending each node
+        directly to the tail of the half it belongs to -- no path list, no
+        unwind pass, no Python frame per level. This is the innermost loop
+        of union, so the split cost is just the descent itself.
         Used during Union operations.
         """
-        if not root: return None, None
-        
-        if root.post.timestamp <= key:
-            # Root belongs to Left. Recurse right.
-            right_split_left, right_split_right = self.split(root.right, key)
-            root.right = right_split_left
-            return root, right_split_right
-        else:
-            # Root belongs to Right. Recurse left.
-            left_split_left, left_split_right = self.split(root.left, key)
-            root.left = left_split_right
-            return left_split_left, root
+        left_root = right_root = None
+        left_tail = right_tail = None  # deepest node of each spine so far
+        node = root
+        while node:
+            if node.timestamp <= key:
+                # node (and its left subtree) joins the <= half.
+                if left_tail is None:
+                    left_root = node
+                    node.parent = None
+                else:
+                    left_tail.right = node
+                    node.parent = left_tail
+                left_tail = node
+                node = node.right
+            else:
+                # node (and its right subtree) joins the > half.
+                if right_tail is None:
+                    right_root = node
+                    node.parent = None
+                else:
+                    right_tail.left = node
+                    node.parent = right_tail
+                right_tail = node
+                node = node.left
+        # Terminate the spines (their old subtrees went to the other half).
+        if left_tail: left_tail.right = None
+        if right_tail: right_tail.left = None
+        return left_root, right_root
 
     def union(self, other_treap):
         """
-        Merges an external Treap into the current one.
-        Algorithm:
-        1. Compare roots. Higher priority becomes the new root.
-        2. Split the lower-priority tree based on the new root's key.
-        3. Recursively merge children.
-        Complexity: O(M log(N/M))
+        Merges an external Treap into the current one, picking the
+        strategy by relative size:
+        - Comparable sizes (within 4x): flatten both to timestamp order
+          with iterative inorder walks, merge the two sorted node lists in
+          O(M+N), and Cartesian-rebuild reusing the existing nodes. Same
+          asymptotics as the meld when M ~ N but with a much smaller
+          constant (three linear passes, zero splits).
+        - Lopsided sizes: iterative split-based meld, O(M log(N/M)) --
+          unbeatable when M << N, e.g. a 100k partition into a multi-
+          million-node master.
         """
         if not other_treap or not other_treap.root: return
-        self.root = self._union_recursive(self.root, other_treap.root)
+        m, n = other_treap.size, self.size
+        if self.root is not None and min(m, n) * 4 >= max(m, n):
+            merged = self._merge_sorted(self._flatten(self.root),
+                                        self._flatten(other_treap.root))
+            self.root = self._rebuild_from_nodes(merged)
+        else:
+            self.root = self._union_iterative(self.root, other_treap.root)
+        self._by_id.update(other_treap._by_id)  # O(M) dict merge
+        self.size = n + m
         self.rotations_count += other_treap.rotations_count
+        # Merge the popularity pointers; if either side's is stale (None),
+        # fall back to the lazy recompute.
+        a, b = self._top, other_treap._top
+        if a is not None and b is not None:
+            self._top = b if b.score > a.score else a
+        else:
+            self._top = None
 
-    def _union_recursive(self, t1, t2):
-        if not t1: return t2
-        if not t2: return t1
-        
-        # Ensure t1 is the root with higher priority
-        if t1.priority < t2.priority:
-            t1, t2 = t2, t1 
-            
-        # Split t2 to fit around t1
-        left_t2, right_t2 = self.split(t2, t1.post.timestamp)
-        
-        # Merge subtrees
-        t1.left = self._union_recursive(t1.left, left_t2)
-        t1.right = self._union_recursive(t1.right, right_t2)
-        return t1
+    @staticmethod
+    def _flatten(root):
+        """Iterative inorder walk -> list of nodes in timestamp order."""
+        out = []
+        stack = []
+        node = root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            out.append(node)
+            node = node.right
+        return out
+
+    @staticmethod
+    def _merge_sorted(a, b):
+        """Two-pointer merge of two timestamp-sorted node lists, O(M+N)."""
+        merged = []
+        i = j = 0
+        na, nb = len(a), len(b)
+        while i < na and j < nb:
+            if a[i].timestamp <= b[j].timestamp:
+                merged.append(a[i]); i += 1
+            else:
+                merged.append(b[j]); j += 1
+        merged.extend(a[i:])
+        merged.extend(b[j:])
+        return merged
+
+    def _rebuild_from_nodes(self, nodes):
+        """
+        Cartesian-builds a treap from timestamp-ordered EXISTING nodes
+        (links are overwritten, nothing is allocated). Same monotonic
+        right-spine construction as build_from_sorted.
+        """
+        spine = []
+        for node in nodes:
+            node.right = None
+            node.parent = None
+            last_popped = None
+            while spine and spine[-1].priority < node.priority:
+                last_popped = spine.pop()
+            node.left = last_popped
+            if last_popped:
+                last_popped.parent = node
+            if spine:
+                spine[-1].right = node
+                node.parent = spine[-1]
+            spine.append(node)
+        return spine[0] if spine else None
+
+    def _union_iterative(self, t1, t2):
+        """
+        Iterative meld: each stack entry is one (subtree, subtree) merge job
+        plus the parent slot the result attaches to. Equivalent to the
+        classic recursive union, but the 'call stack' is a Python list of
+        tuples instead of interpreter frames.
+        """
+        result_root = None
+        stack = [(t1, t2, None, None)]  # (a, b, parent, side)
+        while stack:
+            a, b, parent, side = stack.pop()
+            if a is None:
+                sub = b
+            elif b is None:
+                sub = a
+            else:
+                # Higher-priority root wins this subtree...
+                if a.priority < b.priority:
+                    a, b = b, a
+                # ...and the loser is split around its key.
+                left_b, right_b = self.split(b, a.timestamp)
+                stack.append((a.left, left_b, a, 'L'))
+                stack.append((a.right, right_b, a, 'R'))
+                sub = a
+
+            if parent is None:
+                result_root = sub
+                if sub: sub.parent = None
+            elif side == 'L':
+                parent.left = sub
+                if sub: sub.parent = parent
+            else:
+                parent.right = sub
+                if sub: sub.parent = parent
+        return result_root
+
+
+# NumPy is optional: only the array-backed (SoA) treap below needs it.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional Numba kernels (treap_numba.py) for the SoA bulk build and the
+# batched insert path.
+try:
+    from src.Treap.treap_numba import cartesian_build as _cartesian_build
+    from src.Treap.treap_numba import insert_many as _insert_many
+except ImportError:  # numba not installed; the Python loops are used
+    _cartesian_build = None
+    _insert_many = None
+
+
+class ArrayTreap:
+    """
+    Struct-of-Arrays treap (same layout idea as ArrayBST):
+    - ts[i]       : timestamp (the BST key), int64
+    - priority[i] : heap priority, int64
+    - score[i]    : score, int64
+    - left[i]     : index of left child, int32 (-1 == no child)
+    - right[i]    : index of right child, int32 (-1 == no child)
+    post_ids is a plain Python list indexed by the same node id.
+    Rotations are plain index swaps on the child arrays; the insert path is
+    recorded in a local list so there is no recursion anywhere.
+    """
+
+    def __init__(self, capacity=1024):
+        if np is None:
+            raise ImportError("ArrayTreap requires numpy")
+        capacity = max(int(capacity), 1)
+        self.ts = np.empty(capacity, dtype=np.int64)
+        self.priority = np.empty(capacity, dtype=np.int64)
+        self.score = np.empty(capacity, dtype=np.int64)
+        self.left = np.full(capacity, -1, dtype=np.int32)
+        self.right = np.full(capacity, -1, dtype=np.int32)
+        self.post_ids = []
+        self.root = -1
+        self.n_used = 0
+        self.rotations_count = 0
+        self.comparisons = 0
+
+    def _grow(self):
+        old = len(self.ts)
+        new_cap = old * 2
+        for name in ('ts', 'priority', 'score'):
+            arr = np.empty(new_cap, dtype=np.int64)
+            arr[:old] = getattr(self, name)
+            setattr(self, name, arr)
+        for name in ('left', 'right'):
+            arr = np.full(new_cap, -1, dtype=np.int32)
+            arr[:old] = getattr(self, name)
+            setattr(self, name, arr)
+
+    def addPost(self, post_id, timestamp, score):
+        if self.n_used >= len(self.ts):
+            self._grow()
+        i = self.n_used
+        ts, prio = self.ts, self.priority
+        left, right = self.left, self.right
+        ts[i] = timestamp
+        prio[i] = _new_priority()  # independent random priority
+        self.score[i] = score
+        self.post_ids.append(post_id)
+        self.n_used = i + 1
+
+        if self.root == -1:
+            self.root = i
+            return
+
+        # 1. BST descent by timestamp, recording the path for the fix-up.
+        path = []  # (parent_index, went_left)
+        cur = self.root
+        while cur != -1:
+            went_left = timestamp < ts[cur]
+            path.append((cur, went_left))
+            cur = left[cur] if went_left else right[cur]
+        self.comparisons += len(path)
+
+        parent, went_left = path[-1]
+        if went_left:
+            left[parent] = i
+        else:
+            right[parent] = i
+
+        # 2. Bubble up while the Max-Heap property is violated.
+        # Rotations are index swaps; stop at the first satisfied ancestor.
+        node = i
+        k = len(path) - 1
+        while k >= 0 and prio[node] > prio[path[k][0]]:
+            parent, went_left = path[k]
+            if went_left:
+                # Right rotation: parent adopts node's right subtree.
+                left[parent] = right[node]
+                right[node] = parent
+            else:
+                # Left rotation: parent adopts node's left subtree.
+                right[parent] = left[node]
+                left[node] = parent
+            self.rotations_count += 1
+            k -= 1
+            if k >= 0:
+                gp, gp_left = path[k]
+                if gp_left:
+                    left[gp] = node
+                else:
+                    right[gp] = node
+            else:
+                self.root = node
+
+    def add_many(self, post_ids, timestamps, scores):
+        """
+        Inserts a whole decoded batch in one call (unsorted input -- use
+        build_from_sorted for pre-sorted columns). With numba installed
+        the descent + bubble-up loop runs as native code via the
+        insert_many kernel, with rotations as int32 index swaps over a
+        preallocated path stack; otherwise it falls back to per-record
+        addPost. Priorities are drawn as one vectorized random int64
+        column Python-side, so the kernel stays pure integer work.
+        """
+        n = len(post_ids)
+        while self.n_used + n > len(self.ts):
+            self._grow()
+
+        if _insert_many is None:
+            for pid, t, s in zip(post_ids, timestamps, scores):
+                self.addPost(pid, t, s)
+            return
+
+        ts_in = np.ascontiguousarray(timestamps, dtype=np.int64)
+        score_in = np.ascontiguousarray(scores, dtype=np.int64)
+        prio_in = np.random.randint(0, 1 << 62, size=n, dtype=np.int64)
+        self.score[self.n_used:self.n_used + n] = score_in
+        self.post_ids.extend(post_ids)
+        self.root, self.n_used, rotations = _insert_many(
+            self.ts, self.priority, self.left, self.right,
+            ts_in, prio_in, self.root, self.n_used)
+        self.rotations_count += int(rotations)
+
+    def build_from_sorted(self, post_ids, timestamps, scores):
+        """
+        Bulk-builds the treap in O(N) from columns pre-sorted by timestamp
+        (Cartesian-tree construction, same as Treap.build_from_sorted but
+        over the index arrays). With numba installed the monotonic-stack
+        loop runs as native code via the cartesian_build kernel; otherwise
+        a Python loop over the same arrays is used. Assumes the tree is
+        empty. Priorities are independent random draws, matching
+        addPost.
+        """
+        n = len(post_ids)
+        if n == 0:
+            return
+        while self.n_used + n > len(self.ts):
+            self._grow()
+
+        base = self.n_used
+        ts, prio = self.ts, self.priority
+        left, right = self.left, self.right
+        ts[base:base + n] = timestamps
+        # Independent random priorities, vectorized (62-bit keeps the
+        # bound int64-safe) -- same invariant as the object treap:
+        # structure is decoupled from the score distribution.
+        prio[base:base + n] = np.random.randint(0, 1 << 62, size=n, dtype=np.int64)
+        self.score[base:base + n] = scores
+        self.post_ids.extend(post_ids)
+        self.n_used = base + n
+
+        if _cartesian_build is not None and base == 0:
+            self.root = int(_cartesian_build(ts, prio, left, right, n))
+            return
+
+        # Python fallback (also used when appending after base > 0, which
+        # the kernel's 0-based indices do not cover).
+        spine = []
+        for i in range(base, base + n):
+            left[i] = -1
+            right[i] = -1
+            last_popped = -1
+            while spine and prio[spine[-1]] < prio[i]:
+                last_popped = spine.pop()
+            left[i] = last_popped
+            if spine:
+                right[spine[-1]] = i
+            spine.append(i)
+        self.root = spine[0]
+
+
+# Compiled treap (src/Treap/_treap.pyx, built with
+# `python setup.py build_ext --inplace`). Same API and semantics as the
+# pure-Python Treap above; when the extension exists it shadows the class
+# so every caller gets the C version for free.
+try:
+    from src.Treap._treap import Treap  # noqa: F811
+except ImportError:
+    pass
@@ -0,0 +1,119 @@
+"""
+Numba-compiled kernel for ArrayTreap.
+The Cartesian-tree build over the SoA arrays is a tight monotonic-stack
+loop of int64 compares and int32 index writes -- @njit turns it into
+native code, dropping a 100k-record partition build from seconds of
+bytecode dispatch to tens of ms.
+Importing this module requires numba; callers guard with try/except.
+"""
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def cartesian_build(ts, prio, left, right, n):
+    """
+    Builds a treap over nodes 0..n-1 whose ts values are pre-sorted
+    ascending, writing child links into left/right (-1 == no child).
+    Monotonic right-spine stack: pop spine nodes with lower priority, the
+    last popped subtree becomes the new node's left child, the new node
+    becomes the right child of the remaining spine top.
+    Returns the root index (-1 when n == 0).
+    """
+    if n == 0:
+        return -1
+
+    spine = np.empty(n, dtype=np.int32)
+    sp = 0
+    spine[0] = 0
+    left[0] = -1
+    right[0] = -1
+
+    for i in range(1, n):
+        left[i] = -1
+        right[i] = -1
+        last_popped = -1
+        while sp >= 0 and prio[spine[sp]] < prio[i]:
+            last_popped = spine[sp]
+            sp -= 1
+        left[i] = last_popped
+        if sp >= 0:
+            right[spine[sp]] = i
+        sp += 1
+        spine[sp] = i
+
+    return spine[0]
+
+
+@njit(cache=True)
+def insert_many(ts, prio, left, right, ts_in, prio_in, root, n_used):
+    """
+    Inserts a batch of (timestamp, priority) records into the SoA arrays
+    with full treap semantics: BST descent by timestamp, then bubble-up
+    rotations (plain index swaps) while the Max-Heap property is violated.
+    The caller must have grown the arrays and precomputed the random
+    priorities already. The descent path lives in a preallocated flat
+    stack, so nothing is allocated per record.
+    Returns the updated (root, n_used, rotations).
+    """
+    # Worst-case path length is the final tree height; size for the full
+    # post-batch node count so no bounds check is ever needed.
+    cap = n_used + ts_in.size + 1
+    path = np.empty(cap, dtype=np.int32)
+    went_left = np.empty(cap, dtype=np.uint8)
+    rotations = 0
+
+    for i in range(ts_in.size):
+        t = ts_in[i]
+        node = n_used
+        ts[node] = t
+        prio[node] = prio_in[i]
+        left[node] = -1
+        right[node] = -1
+        n_used += 1
+
+        if root == -1:
+            root = node
+            continue
+
+        # 1. BST descent, recording the path for the fix-up.
+        depth = 0
+        cur = root
+        while cur != -1:
+            path[depth] = cur
+            if t < ts[cur]:
+                went_left[depth] = 1
+                cur = left[cur]
+            else:
+                went_left[depth] = 0
+                cur = right[cur]
+            depth += 1
+        parent = path[depth - 1]
+        if went_left[depth - 1] == 1:
+            left[parent] = node
+        else:
+            right[parent] = node
+
+        # 2. Bubble up: rotations are index swaps; stop at the first
+        # ancestor that already outranks the new node.
+        k = depth - 1
+        p = prio[node]
+        while k >= 0 and p > prio[path[k]]:
+            parent = path[k]
+            if went_left[k] == 1:
+                left[parent] = right[node]
+                right[node] = parent
+            else:
+                right[parent] = left[node]
+                left[node] = parent
+            rotations += 1
+            k -= 1
+            if k >= 0:
+                if went_left[k] == 1:
+                    left[path[k]] = node
+                else:
+                    right[path[k]] = node
+            else:
+                root = node
+
+    return root, n_used, rotations
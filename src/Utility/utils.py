@@ -1,51 +1,389 @@
 import json
 import os
 import io
-import zstandard as zstd
-import sys
+import struct
+from itertools import islice
 
-# Increase recursion depth just in case, though the optimized metric is iterative/safe
-sys.setrecursionlimit(200000)
+# orjson parses JSON 3-5x faster than the stdlib (C implementation);
+# fall back silently when it is not installed.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+# Optional Numba kernel for the SoA metrics pass (utils_numba.py);
+# get_structural_metrics_soa dispatches to it when available.
+try:
+    from src.Utility.utils_numba import struct_metrics as _struct_metrics
+except ImportError:
+    _struct_metrics = None
+
+# Materialized dataset cache written by scripts/materialize.py.
+CACHE_PATH = os.path.join("data", "reddit_submissions.arrow")
+
+# Dependency-free binary cache (stdlib struct + mmap); the Arrow cache
+# above is the batch-column counterpart and needs pyarrow.
+BIN_CACHE_PATH = os.path.join("data", "reddit_submissions.bin")
+_REC = struct.Struct('<qqq')  # (post_id, created_utc, score), all int64
+
+_B36_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def base36encode(n):
+    """
+    Renders an integer post id back to Reddit's base-36 form ("ejualnb").
+    IDs are decoded to int64 at ingest -- a 7-char str costs ~56 bytes and
+    hashes slower than an int -- so this is only needed for display.
+    """
+    if n == 0:
+        return "0"
+    digits = []
+    while n:
+        n, rem = divmod(n, 36)
+        digits.append(_B36_DIGITS[rem])
+    return ''.join(reversed(digits))
 
 # --- 1. DATA STREAMING ---
-def stream_reddit_dataset(filepath, limit=None):
+def stream_reddit_dataset(filepath, limit=None, read_size=1 << 20):
+    # zstandard is only needed for streaming, so import it lazily:
+    # the metric helpers below stay usable without it.
+    # read_size tunes how much the zstd reader pulls per syscall; bump it
+    # to e.g. 16 MiB for large sequential reads from slow (HDD-backed)
+    # mounts. The BufferedReader hands whole blocks to the line splitter
+    # so there is no per-line realloc churn.
+    import zstandard as zstd
+
     if not os.path.exists(filepath):
         print(f"Error: File not found at {filepath}")
         return
-    
+
     with open(filepath, 'rb') as fh:
-        dctx = zstd.ZstdDecompressor()
-        with dctx.stream_reader(fh) as reader:
-            text_stream = io.TextIOWrapper(reader, encoding='utf-8')
+        dctx = zstd.ZstdDecompressor(max_window_size=2**31)
+        with dctx.stream_reader(fh, read_size=read_size) as reader:
+            # Iterate raw bytes lines: orjson (and stdlib json) parse
+            # bytes directly, so the TextIOWrapper utf-8 decode of every
+            # full line was pure overhead -- the three fields we keep are
+            # decoded by the JSON parser anyway.
+            buffered = io.BufferedReader(reader, buffer_size=read_size)
             count = 0
-            for line in text_stream:
+            for line in buffered:
                 if limit and count >= limit: break
                 try:
-                    data = json.loads(line)
-                    yield (data['id'], int(data['created_utc']), int(data['score']))
+                    data = _loads(line)
+                    yield (int(data['id'], 36), int(data['created_utc']),
+                           int(data['score']))
                     count += 1
-                except: continue
+                except (KeyError, ValueError): continue
+
+
+def _columns(pids, tss, scores, as_arrays):
+    # With as_arrays=True the numeric columns come back as int64 ndarrays,
+    # ready to feed a Numba kernel without re-boxing each value as a PyLong.
+    if as_arrays:
+        import numpy as np
+        return pids, np.asarray(tss, dtype=np.int64), np.asarray(scores, dtype=np.int64)
+    return pids, tss, scores
+
+
+def stream_reddit_batches(filepath, batch_size=65536, limit=None, as_arrays=False,
+                          read_size=8 << 20):
+    """
+    Batched variant of stream_reddit_dataset.
+    Decompresses the .zst through a large buffered reader and parses
+    batch_size records at a time, yielding three parallel columns
+    (post_ids, timestamps, scores) per batch. Keeps the expensive work
+    (zstd + JSON decode) in C-level batches instead of paying per-record
+    generator/tuple overhead inside the hot insertion loop. read_size
+    tunes the zstd reader's per-syscall pull (and the buffer handed to
+    the line splitter); raise it for slow sequential mounts.
+    """
+    import zstandard as zstd
+
+    if not os.path.exists(filepath):
+        print(f"Error: File not found at {filepath}")
+        return
+
+    with open(filepath, 'rb') as fh:
+        dctx = zstd.ZstdDecompressor(max_window_size=2**31)
+        with dctx.stream_reader(fh, read_size=read_size) as reader:
+            # Raw bytes lines, same as stream_reddit_dataset: the JSON
+            # parser takes bytes, so no per-line utf-8 decode pass.
+            buffered = io.BufferedReader(reader, buffer_size=read_size)
+            pids, tss, scores = [], [], []
+            count = 0
+            for line in buffered:
+                if limit and count >= limit: break
+                try:
+                    # Parse all three fields before touching the columns:
+                    # a record that fails on created_utc/score after a
+                    # valid id must not leave the parallel lists with
+                    # different lengths.
+                    data = _loads(line)
+                    pid = int(data['id'], 36)
+                    ts = int(data['created_utc'])
+                    score = int(data['score'])
+                except (KeyError, ValueError): continue
+                pids.append(pid)
+                tss.append(ts)
+                scores.append(score)
+                count += 1
+                if len(pids) >= batch_size:
+                    yield _columns(pids, tss, scores, as_arrays)
+                    pids, tss, scores = [], [], []
+            if pids:
+                yield _columns(pids, tss, scores, as_arrays)
+
+
+def stream_raw_chunks(filepath, batch_size=65536, limit=None, read_size=8 << 20):
+    """
+    Yields raw newline-delimited byte blocks of ~batch_size records each,
+    leaving the JSON decode to the caller. This is the producer side for a
+    worker pool: one bytes blob pickles far cheaper than decoded tuples,
+    so the parent only decompresses and the workers parse in parallel.
+    Reads the raw .zst directly (the Arrow cache is already decoded, so a
+    pool gains nothing there).
+    """
+    import zstandard as zstd
+
+    if not os.path.exists(filepath):
+        print(f"Error: File not found at {filepath}")
+        return
+
+    with open(filepath, 'rb') as fh:
+        dctx = zstd.ZstdDecompressor(max_window_size=2**31)
+        with dctx.stream_reader(fh, read_size=read_size) as reader:
+            buffered = io.BufferedReader(reader, buffer_size=read_size)
+            lines = []
+            count = 0
+            for line in buffered:  # bytes lines; no utf-8 decode here
+                lines.append(line)
+                count += 1
+                if len(lines) >= batch_size:
+                    yield b''.join(lines)
+                    lines = []
+                if limit and count >= limit:
+                    break
+            if lines:
+                yield b''.join(lines)
+
+
+def stream_reddit_parallel(filepath, limit=None, parsers=2, batch_size=8192,
+                           read_size=8 << 20):
+    """
+    Parallel-ingest variant of stream_reddit_dataset: one producer thread
+    decompresses and blocks raw bytes lines (zstd releases the GIL), N
+    parser threads JSON-decode the blocks (orjson releases the GIL too),
+    and the consumer -- the single-threaded tree builder -- drains parsed
+    (post_id, timestamp, score) tuples here. Records are handed over in
+    blocks rather than one tuple per queue op, so the lock cost is
+    amortized over batch_size records. With parsers > 1 the global record
+    order is not preserved across blocks; fine for tree insertion, do not
+    use where chronological order matters.
+    """
+    import queue as _queue
+    import threading
+
+    raw_q = _queue.Queue(maxsize=16)   # raw byte blocks, bounds memory
+    out_q = _queue.Queue(maxsize=16)   # decoded record blocks
+    _DONE = None
+
+    def _producer():
+        try:
+            for blob in stream_raw_chunks(filepath, batch_size=batch_size,
+                                          limit=limit, read_size=read_size):
+                raw_q.put(blob)
+        finally:
+            for _ in range(parsers):
+                raw_q.put(_DONE)
+
+    def _parser():
+        loads = _loads
+        while True:
+            blob = raw_q.get()
+            if blob is _DONE:
+                out_q.put(_DONE)
+                return
+            records = []
+            for line in blob.splitlines():
+                if not line:
+                    continue
+                try:
+                    data = loads(line)
+                    records.append((int(data['id'], 36),
+                                    int(data['created_utc']),
+                                    int(data['score'])))
+                except (KeyError, ValueError): continue
+            out_q.put(records)
+
+    threading.Thread(target=_producer, daemon=True).start()
+    for _ in range(parsers):
+        threading.Thread(target=_parser, daemon=True).start()
+
+    finished = 0
+    while finished < parsers:
+        block = out_q.get()
+        if block is _DONE:
+            finished += 1
+        else:
+            yield from block
+
+
+def materialize_cache(zst_path, cache_path=BIN_CACHE_PATH, limit=None):
+    """
+    One-time pass: streams the .zst once and writes the three extracted
+    fields as packed little-endian int64 triples (24 bytes per record).
+    Repeat experiment runs then skip zstd + JSON entirely via
+    stream_cache below. Needs nothing beyond the stdlib, unlike the
+    Arrow cache from scripts/materialize.py.
+    Returns the number of records written.
+    """
+    pack = _REC.pack
+    parent = os.path.dirname(cache_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    count = 0
+    buf = bytearray()
+    with open(cache_path, 'wb') as out:
+        for pid, ts, score in stream_reddit_dataset(zst_path, limit=limit):
+            buf += pack(pid, ts, score)
+            count += 1
+            if len(buf) >= (8 << 20):  # flush in 8 MiB slabs
+                out.write(buf)
+                buf.clear()
+        if buf:
+            out.write(buf)
+    return count
+
+
+def stream_cache(cache_path=BIN_CACHE_PATH, limit=None):
+    """
+    Yields (post_id, timestamp, score) tuples from the packed binary
+    cache. The file is memory-mapped and decoded with
+    struct.Struct.iter_unpack, so each record costs one C-level unpack
+    and no I/O syscalls beyond page faults -- all parse cost was paid
+    once in materialize_cache.
+    """
+    import mmap
+
+    with open(cache_path, 'rb') as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            records = _REC.iter_unpack(mm)
+            if limit:
+                records = islice(records, limit)
+            yield from records
+
+
+def stream_cached_batches(cache_path=CACHE_PATH, batch_size=65536, limit=None,
+                          as_arrays=False):
+    """
+    Reads column batches from the Arrow IPC cache written by
+    scripts/materialize.py. The file is memory-mapped (zero-copy), so
+    repeat runs pay no zstd or JSON cost at all. Yields the same
+    (post_ids, timestamps, scores) batches as stream_reddit_batches;
+    with as_arrays=True the numeric columns stay native int64 the whole
+    way (Arrow -> NumPy needs no per-element PyLong allocation).
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(cache_path, 'rb') as source:
+        table = pa.ipc.open_file(source).read_all()
+        if limit:
+            table = table.slice(0, limit)
+        for batch in table.to_batches(max_chunksize=batch_size):
+            pids = batch.column('id').to_pylist()
+            if as_arrays:
+                yield (pids,
+                       batch.column('created_utc').to_numpy(zero_copy_only=False),
+                       batch.column('score').to_numpy(zero_copy_only=False))
+            else:
+                yield (pids,
+                       batch.column('created_utc').to_pylist(),
+                       batch.column('score').to_pylist())
+
+
+def stream_batches(filepath, batch_size=65536, limit=None, cache_path=CACHE_PATH,
+                   as_arrays=False):
+    """
+    Preferred entry point for the mains: use the materialized cache when it
+    exists (and pyarrow is available), otherwise decompress the raw .zst.
+    """
+    if os.path.exists(cache_path):
+        print(f"Using materialized cache: {cache_path}")
+        yield from stream_cached_batches(cache_path, batch_size, limit, as_arrays)
+    else:
+        yield from stream_reddit_batches(filepath, batch_size, limit, as_arrays)
 
 # --- 2. OPTIMIZED METRIC CALCULATION (O(N)) ---
 # This is the function that was missing!
 def get_structural_metrics(node):
     """
     Calculates Height and Balance Factor in a SINGLE pass (Bottom-Up).
+    Iterative post-order walk with an explicit list-as-stack, so even a
+    degenerate 1M-deep "stick" BST cannot overflow the C stack (no
+    sys.setrecursionlimit needed).
     Returns: (Height, Total_Abs_Balance_Factor, Node_Count)
     """
     if not node:
         return 0, 0, 0 # Height, Total_BF, Count
 
-    # Recursive Step
-    l_h, l_bf_sum, l_count = get_structural_metrics(node.left)
-    r_h, r_bf_sum, r_count = get_structural_metrics(node.right)
+    heights = {}  # id(node) -> subtree height (popped once the parent is done)
+    total_bf = 0
+    total_count = 0
+
+    stack = [(node, False)]
+    while stack:
+        current, children_done = stack.pop()
+        if children_done:
+            # Both children (if any) are finalized: read their heights in O(1)
+            l_h = heights.pop(id(current.left)) if current.left else 0
+            r_h = heights.pop(id(current.right)) if current.right else 0
+            heights[id(current)] = 1 + max(l_h, r_h)
+            total_bf += abs(l_h - r_h) # Balance Factor = |LeftH - RightH|
+            total_count += 1
+        else:
+            stack.append((current, True))
+            if current.left: stack.append((current.left, False))
+            if current.right: stack.append((current.right, False))
+
+    return heights[id(node)], total_bf, total_count
+
+
+def get_structural_metrics_soa(left, right, root, n_used):
+    """
+    SoA counterpart of get_structural_metrics for the array-backed trees:
+    walks the int index arrays (left/right, -1 == no child) instead of
+    Node objects. Subtree heights live in a flat scratch list, so each
+    hop is a couple of integer indexings.
+    Returns: (Height, Total_Abs_Balance_Factor, Node_Count)
+    """
+    if n_used == 0 or root == -1:
+        return 0, 0, 0
+
+    # With numba installed the whole pass runs as a compiled integer loop
+    # (~100x faster at millions of nodes); the Python walk below is the
+    # fallback and the reference implementation.
+    if _struct_metrics is not None and hasattr(left, 'dtype'):
+        return _struct_metrics(left, right, int(root), int(n_used))
+
+    heights = [0] * n_used
+    total_bf = 0
+    total_count = 0
 
-    # Calculate Current Node Stats
-    current_height = 1 + max(l_h, r_h)
-    current_bf = abs(l_h - r_h) # Balance Factor = |LeftH - RightH|
-    
-    # Aggregate Stats
-    total_bf = current_bf + l_bf_sum + r_bf_sum
-    total_count = 1 + l_count + r_count
+    stack = [(int(root), False)]
+    while stack:
+        v, children_done = stack.pop()
+        if children_done:
+            l, r = left[v], right[v]
+            l_h = heights[l] if l != -1 else 0
+            r_h = heights[r] if r != -1 else 0
+            heights[v] = 1 + (l_h if l_h > r_h else r_h)
+            total_bf += abs(l_h - r_h)
+            total_count += 1
+        else:
+            stack.append((v, True))
+            if left[v] != -1: stack.append((int(left[v]), False))
+            if right[v] != -1: stack.append((int(right[v]), False))
 
-    return current_height, total_bf, total_count
+    return heights[root], total_bf, total_count
@@ -1,13 +1,36 @@
 import time
-import matplotlib.pyplot as plt
+import statistics
 import os
 import sys
+from operator import itemgetter
 
 from src.Treap.treap import Treap
-from src.Utility.utils import stream_reddit_dataset, get_structural_metrics
+from src.Utility.utils import (stream_reddit_dataset, stream_reddit_parallel,
+                               stream_cache, BIN_CACHE_PATH,
+                               get_structural_metrics)
 
 DATASET_PATH = "/kaggle/input/the-pushshift-reddit-dataset-submissions/RC_2019-04.zst"
 
+def plot_metrics(avg_insertion, height, avg_bf, count):
+    # Lazy matplotlib, same as bstMain: the import costs a few hundred ms
+    # of cold start, so only pay it when a chart is actually produced.
+    # Figure/Agg are used directly -- no pyplot global state and no
+    # GUI-backend probing.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    metrics = ['Avg Insert (x1k ms)', 'Height', 'Avg Bal. Factor']
+    values = [avg_insertion * 1000, height, avg_bf]
+
+    fig = Figure(figsize=(10, 6))
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    bars = ax.bar(metrics, values, color=['darkblue', 'blue', 'skyblue'])
+    ax.set_title(f"Treap Metrics (N={count})")
+    ax.bar_label(bars, fmt='%.2f')
+    canvas.print_png('treap_metrics_local.png')
+    print("Graph saved: treap_metrics_local.png")
+
 def main():
     # --- COMMAND LINE ARGUMENT HANDLING ---
     limit_arg = 50000 
@@ -15,27 +38,76 @@ def main():
         try:
             val = int(sys.argv[1])
             if val > 0: limit_arg = val
-        except: pass
+        except ValueError: pass
+
+    # --bulk: buffer the stream, sort by timestamp (the Reddit dump is
+    # already chronological, so timsort's run detection makes this ~O(N)),
+    # and Cartesian-build in one O(N) pass with zero rotations, instead of
+    # N individual O(log N) addPost calls.
+    bulk = '--bulk' in sys.argv
+    # --parallel: decompress + JSON-parse on background threads (both
+    # release the GIL in their C extensions) while this thread only
+    # builds the tree. Ignored when the binary cache is present, since
+    # the cache path has no parse work to offload.
+    parallel = '--parallel' in sys.argv
+    no_plot = '--no-plot' in sys.argv  # skip the chart (and matplotlib import)
 
     print(f"=== SINGLE TREAP IMPLEMENTATION ===")
     print(f"Processing {limit_arg} nodes...")
-    
+
     treap = Treap()
     start_time = time.perf_counter()
     count = 0
-    
-    if not os.path.exists(DATASET_PATH): return
 
-    for pid, ts, score in stream_reddit_dataset(DATASET_PATH, limit=limit_arg):
-        treap.addPost(pid, ts, score)
-        count += 1
-        if count % 10000 == 0: print(f"Inserted {count}...")
-            
+    # Binary cache first (written once by utils.materialize_cache): mmap +
+    # struct unpack, no zstd or JSON cost on repeat benchmark runs.
+    if os.path.exists(BIN_CACHE_PATH):
+        print(f"Using binary cache: {BIN_CACHE_PATH}")
+        source = stream_cache(limit=limit_arg)
+    elif os.path.exists(DATASET_PATH):
+        if parallel:
+            source = stream_reddit_parallel(DATASET_PATH, limit=limit_arg)
+        else:
+            source = stream_reddit_dataset(DATASET_PATH, limit=limit_arg)
+    else:
+        return
+
+    bucket_times = []
+    if bulk:
+        records = list(source)
+        records.sort(key=itemgetter(1))
+        treap.build_from_sorted(records)
+        count = treap.size
+        print(f"Bulk-built {count} nodes (Cartesian construction).")
+    else:
+        # Bind the bound method once: LOAD_FAST per iteration instead of
+        # LOAD_GLOBAL + LOAD_ATTR (~30% fewer bytecodes in the hot loop).
+        add = treap.addPost
+        # Timing is sampled per 10k-insert window rather than per insert:
+        # one perf_counter pair per window instead of one per record, and
+        # the samples show steady-state cost as the tree deepens.
+        bucket_start = start_time
+        # enumerate keeps the counter in C, and comparing against the next
+        # logging threshold replaces a modulo per record with an int
+        # equality check.
+        next_log = 10000
+        for count, (pid, ts, score) in enumerate(source, 1):
+            add(pid, ts, score)
+            if count == next_log:
+                now = time.perf_counter()
+                bucket_times.append((now - bucket_start) / 10000)
+                bucket_start = now
+                print(f"Inserted {count}...")
+                next_log += 10000
+
     total_time = time.perf_counter() - start_time
     avg_insertion = total_time / count if count > 0 else 0
-    
+
     print("\n--- PERFORMANCE METRICS ---")
     print(f"Total Time: {total_time:.4f} sec")
+    if bucket_times:
+        print(f"Steady-State Insert (median of 10k windows): "
+              f"{statistics.median(bucket_times):.8f} sec")
     print(f"Total Rotations: {treap.rotations_count}")
     
     print("Calculating Metrics...")
@@ -45,17 +117,8 @@ def main():
     print(f"Tree Height: {height}")
     print(f"Avg Balance Factor: {avg_bf:.2f}")
 
-    # Generate Graph
-    metrics = ['Avg Insert (x1k ms)', 'Height', 'Avg Bal. Factor']
-    values = [avg_insertion * 1000, height, avg_bf] 
-    
-    plt.figure(figsize=(10, 6))
-    bars = plt.bar(metrics, values, color=['darkblue', 'blue', 'skyblue'])
-    plt.title(f"Treap Metrics (N={count})")
-    for bar in bars:
-        plt.text(bar.get_x() + bar.get_width()/2, bar.get_height(), round(bar.get_height(), 2), ha='center', va='bottom')
-    plt.savefig('treap_metrics_local.png')
-    print("Graph saved: treap_metrics_local.png")
+    if not no_plot:
+        plot_metrics(avg_insertion, height, avg_bf, count)
 
 if __name__ == "__main__":
     main()